@@ -0,0 +1,373 @@
+import argparse
+import asyncio
+import json
+import ssl
+import time
+from urllib.parse import urlparse
+import batch
+import ops
+import plan
+import tables
+import waits
+from browser_profile import EXAMPLE_DOMAIN, SELENIUM_URL
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+NEXT_BUTTON = '//*[contains(@class,"next-button") and not(@disabled)]'
+
+
+class WebDriverError(Exception):
+
+    def __init__(self, error, message):
+        super().__init__(f'{error}: {message}')
+        self.error = error
+
+
+class StaleConnection(ConnectionError):
+    # the server closed a connection before sending any of the response
+    pass
+
+
+class ConnectionPool:
+    # keep-alive HTTP/1.1 connections shared by every session in the loop
+
+    def __init__(self, url, size=64):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.secure = parsed.scheme == 'https'
+        self.port = parsed.port or (443 if self.secure else 80)
+        self.prefix = parsed.path.rstrip('/')
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+
+    async def connect(self):
+        if self.idle:
+            return self.idle.pop() + (True,)
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=ssl.create_default_context() if self.secure else None)
+        return reader, writer, False
+
+    async def request(self, method, path, body=None):
+        async with self.slots:
+            while True:
+                reader, writer, reused = await self.connect()
+                try:
+                    status, headers, data = await self.exchange(reader, writer, method, path, body)
+                except StaleConnection:
+                    writer.close()
+                    # an idle connection the server timed out; anything else
+                    # may already have been acted on and is not sent twice
+                    if reused:
+                        continue
+                    raise
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    raise
+                if headers.get('connection', '').lower() == 'close':
+                    writer.close()
+                else:
+                    self.idle.append((reader, writer))
+                return status, json.loads(data) if data else {}
+
+    async def exchange(self, reader, writer, method, path, body):
+        payload = json.dumps(body).encode() if body is not None else b''
+        writer.write(
+            f'{method} {self.prefix}{path} HTTP/1.1\r\n'
+            f'Host: {self.host}:{self.port}\r\n'
+            'Connection: keep-alive\r\n'
+            'Content-Type: application/json; charset=utf-8\r\n'
+            f'Content-Length: {len(payload)}\r\n\r\n'.encode() + payload)
+        try:
+            await writer.drain()
+            line = await reader.readuntil(b'\r\n')
+        except asyncio.IncompleteReadError as error:
+            if error.partial:
+                raise
+            raise StaleConnection('Connection closed before the response') from error
+        except ConnectionError as error:
+            raise StaleConnection(str(error)) from error
+
+        status = int(line.split()[1])
+        headers = {}
+        while True:
+            line = (await reader.readuntil(b'\r\n')).decode().strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            data = b''
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                data += chunk[:-2]
+        else:
+            data = await reader.readexactly(int(headers.get('content-length', 0)))
+        return status, headers, data
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+class AsyncDriver:
+
+    def __init__(self, pool, session_id):
+        self.pool = pool
+        self.session_id = session_id
+
+    @classmethod
+    async def start(cls, pool, capabilities=None):
+        capabilities = capabilities or {
+            'browserName': 'chrome',
+            'goog:chromeOptions': {'args': ['--no-sandbox']},
+        }
+        value = await command(pool, 'POST', '/session',
+                              {'capabilities': {'alwaysMatch': capabilities}})
+        driver = cls(pool, value['sessionId'])
+        await driver.command('POST', '/timeouts', {'script': int(waits.script_timeout() * 1000)})
+        return driver
+
+    async def command(self, method, path, body=None):
+        return await command(self.pool, method, f'/session/{self.session_id}{path}', body)
+
+    async def get(self, url):
+        await self.command('POST', '/url', {'url': url})
+
+    async def title(self):
+        return await self.command('GET', '/title')
+
+    async def find_elements(self, xpath):
+        return await self.command('POST', '/elements', {'using': 'xpath', 'value': xpath})
+
+    async def click(self, element):
+        await self.command('POST', f'/element/{element[ELEMENT_KEY]}/click', {})
+
+    async def send_keys(self, element, value):
+        await self.command('POST', f'/element/{element[ELEMENT_KEY]}/value', {'text': str(value)})
+
+    async def execute_script(self, script, *args):
+        return await self.command('POST', '/execute/sync', {'script': script, 'args': list(args)})
+
+    async def execute_async_script(self, script, *args):
+        return await self.command('POST', '/execute/async', {'script': script, 'args': list(args)})
+
+    async def quit(self):
+        await command(self.pool, 'DELETE', f'/session/{self.session_id}')
+
+
+async def command(pool, method, path, body=None):
+    status, response = await pool.request(method, path, body)
+    value = response.get('value')
+    if isinstance(value, dict) and 'error' in value:
+        raise WebDriverError(value['error'], value.get('message'))
+    if status >= 400:
+        raise WebDriverError('http error', f'{status} for {method} {path}')
+    return value
+
+
+class AsyncSession:
+    # async counterparts of the TestExamples helpers
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def fail(self, message):
+        raise AssertionError(message)
+
+    async def check_if_exists(self, selector, timeout=None):
+        timeout = timeout or waits.timeout()
+        try:
+            elem, _ = await self.driver.execute_async_script(
+                waits.WAIT_SCRIPT, selector, int(timeout * 1000), waits.SETTLE_MS)
+        except WebDriverError as error:
+            if error.error != 'javascript error':
+                raise
+            return False
+        return elem or False
+
+    async def perform(self, steps, helper=None):
+        timeout = waits.timeout(helper)
+        for op in steps:
+            if op.kind == 'wait':
+                await self.check_if_exists(op.selector, timeout)
+                continue
+            if op.kind == 'call':
+                await getattr(self, op.selector)(next=False, **op.value)
+                continue
+            if op.kind == 'batch':
+                await self.fill_many(op.value, next=False)
+                continue
+            elem = await self.check_if_exists(op.selector, timeout)
+            if elem is False:
+                if op.kind == 'find_all':
+                    missing = [o.message for o in op.value
+                               if not await self.driver.find_elements(o.selector)]
+                    self.fail('; '.join(missing) or 'Page did not render')
+                self.fail(op.message or f'{op.selector} not found')
+            if op.kind == 'type':
+                await self.driver.send_keys(elem, op.value)
+            elif op.kind in ('click', 'click_when_clickable'):
+                await self.driver.click(elem)
+
+    async def fill_many(self, fields, next=True):
+        for native, run in batch.split(fields):
+            if native:
+                await self.perform(run, 'fill_many')
+                continue
+            errors = await self.driver.execute_async_script(
+                batch.FILL_MANY_SCRIPT, run,
+                int(waits.timeout('fill_many') * 1000), waits.SETTLE_MS)
+            if errors:
+                self.fail('\n'.join(error for error, _ in errors))
+        if next:
+            await self.next()
+
+    async def expect_text(self, content, next=True):
+        await self.perform(ops.expect_text(content), 'expect_text')
+        if next:
+            await self.next()
+
+    async def expect_link(self, content, url, next=True):
+        await self.perform(ops.expect_link(content, url), 'expect_link')
+        if next:
+            await self.next()
+
+    async def expect_file(self, content, downloadUrl, next=True):
+        await self.perform(ops.expect_file(content, downloadUrl), 'expect_file')
+        if next:
+            await self.next()
+
+    async def expect_panda_table(self, columns, next=True):
+        timeout = waits.timeout('expect_panda_table')
+        if await self.check_if_exists('//table/thead/tr/th', timeout) is False:
+            self.fail('Table not found')
+        table = await self.driver.execute_async_script(
+            tables.TABLE_SCRIPT, None, int(timeout * 1000), tables.PAGE_SETTLE_MS)
+        headers = table['columns'] if table else []
+        for index, column in enumerate(columns):
+            if index >= len(headers) or column not in headers[index]:
+                self.fail(f'Column {column} not found')
+        if next:
+            await self.next()
+
+    async def fill_text(self, label, value, next=True, placeholder="Your answer here", type="text-input", index="0"):
+        await self.perform(ops.fill_text(label, value, placeholder, type, index), 'fill_text')
+        if next:
+            await self.next()
+
+    async def fill_textarea(self, label, value, next=True, placeholder="Your answer here", type="textarea-input", index="0"):
+        await self.perform(ops.fill_textarea(label, value, placeholder, type, index), 'fill_textarea')
+        if next:
+            await self.next()
+
+    async def fill_phone(self, label, value, next=True, placeholder="(000)000-0000", type="phone-input", index="0"):
+        await self.perform(ops.fill_phone(label, value, placeholder, type, index), 'fill_phone')
+        if next:
+            await self.next()
+
+    async def fill_date(self, label, value, next=True, type="date-input", index="0"):
+        await self.perform(ops.fill_date(label, value, type, index), 'fill_date')
+        if next:
+            await self.next()
+
+    async def fill_option(self, label, value, next=True, buttonText="Next", type="multiple-choice-input", index="0"):
+        await self.perform(ops.fill_option(label, value, buttonText, type, index), 'fill_option')
+        if buttonText and next:
+            await self.next()
+
+    async def fill_multiple_options(self, label, values, next=True, type="multiple-choice-input", index="0"):
+        await self.perform(ops.fill_multiple_options(label, values, type, index), 'fill_multiple_options')
+        if next:
+            await self.next()
+
+    async def fill_dropdown(self, label, value, next=True, type="dropdown-input", index="0"):
+        await self.perform(ops.fill_dropdown(label, value, type, index), 'fill_dropdown')
+        if next:
+            await self.next()
+
+    async def fill_card(self, label, value, next=True, type="cards-input", index="0"):
+        await self.perform(ops.fill_card(label, value, type, index), 'fill_card')
+        if next:
+            await self.next()
+
+    async def fill_file(self, label, value,  next=True, type='file-input', index="0"):
+        await self.perform(ops.fill_file(label, value, type, index), 'fill_file')
+        if next:
+            await self.next()
+
+    async def next(self):
+        elem = await self.check_if_exists(NEXT_BUTTON, waits.timeout('next'))
+        if elem is False:
+            self.fail('Next button not found')
+        await self.driver.click(elem)
+
+    async def wait_for_title(self, title):
+        deadline = time.monotonic() + waits.timeout('title')
+        while await self.driver.title() != title:
+            if time.monotonic() > deadline:
+                self.fail(f'Title {title} not found')
+            await asyncio.sleep(0.1)
+
+    async def run_flow(self, name, base_url=EXAMPLE_DOMAIN):
+        flow = plan.load(name)
+        await self.driver.get(f"{base_url}/{flow.form_id}")
+        await self.wait_for_title(flow.title)
+        await self.next()
+        for page in flow.pages:
+            await self.perform(page.ops)
+            if page.advance == 'next':
+                await self.next()
+
+
+async def run_session(pool, names, base_url):
+    results = []
+    driver = await AsyncDriver.start(pool)
+    try:
+        session = AsyncSession(driver)
+        for name in names:
+            start = time.perf_counter()
+            try:
+                await session.run_flow(name, base_url)
+                status = 'ok'
+            except (AssertionError, WebDriverError) as error:
+                status = f'FAIL: {error}'
+            results.append((name, status, time.perf_counter() - start))
+    finally:
+        await driver.quit()
+    return results
+
+
+async def run(url, names, sessions, base_url=EXAMPLE_DOMAIN):
+    pool = ConnectionPool(url)
+    try:
+        return await asyncio.gather(
+            *(run_session(pool, names, base_url) for _ in range(sessions)))
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Drive many WebDriver sessions from one event loop.')
+    parser.add_argument('flows', nargs='*', help='flow names (default: all)')
+    parser.add_argument('--url', default=SELENIUM_URL,
+                        help='WebDriver endpoint, e.g. a grid or chromedriver')
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--base-url', default=EXAMPLE_DOMAIN)
+    args = parser.parse_args()
+    if not args.url:
+        parser.error('--url or ABSTRA_SELENIUM_URL is required')
+
+    start = time.perf_counter()
+    sessions = asyncio.run(run(args.url, args.flows or plan.flow_names(),
+                               args.sessions, args.base_url.rstrip('/')))
+    failures = 0
+    for number, results in enumerate(sessions):
+        for name, status, duration in results:
+            failures += status != 'ok'
+            print(f'[{number}] {name} ... {status} ({duration:.3f}s)')
+    print(f'{sum(map(len, sessions))} flows in {time.perf_counter() - start:.3f}s, {failures} failed')
+    raise SystemExit(1 if failures else 0)
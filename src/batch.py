@@ -0,0 +1,85 @@
+import re
+import ops
+import waits
+from plan import step_args
+
+# Fields that only react to real key events (input masks, file pickers),
+# plus auto-advancing buttons, are left to WebDriver.
+NATIVE_ACTIONS = {'fill_phone', 'fill_file'}
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+FILL_MANY_SCRIPT = waits.ACTIVITY_JS + """
+const [fields, timeout, settle, done] = arguments;
+
+function setValue(elem, value) {
+  const proto = elem instanceof HTMLTextAreaElement
+    ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+  Object.getOwnPropertyDescriptor(proto, 'value').set.call(elem, elem.value + value);
+  elem.dispatchEvent(new Event('input', {bubbles: true}));
+  elem.dispatchEvent(new Event('change', {bubbles: true}));
+}
+
+// Synthetic events only bubble up, so they go to the element a real
+// click would hit, e.g. the .vs__dropdown-toggle inside a .v-select.
+function press(elem) {
+  elem.scrollIntoView({block: 'center'});
+  const rect = elem.getBoundingClientRect();
+  const hit = document.elementFromPoint(rect.left + rect.width / 2, rect.top + rect.height / 2);
+  const target = hit && elem.contains(hit) ? hit : elem;
+  for (const type of ['pointerdown', 'mousedown', 'pointerup', 'mouseup']) {
+    target.dispatchEvent(new MouseEvent(type, {bubbles: true, cancelable: true, view: window}));
+  }
+  target.click();
+}
+
+(async () => {
+  const errors = [];
+  for (const [name, steps] of fields) {
+    for (const op of steps) {
+      const {elem, timedOut} = await abstraWaitFor(op.selector, timeout, settle);
+      if (!elem) {
+        if (op.kind === 'wait') continue;
+        errors.push([`${name}: ${op.message}`, timedOut]);
+        break;
+      }
+      if (op.kind === 'type') setValue(elem, op.value);
+      else if (op.kind === 'click') press(elem);
+    }
+  }
+  return errors;
+})().then(done, (e) => done([[String(e), false]]));
+"""
+
+
+def is_native(step):
+    if step['action'] in NATIVE_ACTIONS:
+        return True
+    if step['action'] == 'fill_option' and step.get('buttonText', 'Next') is None:
+        return True
+    if step['action'] == 'fill_date' and not ISO_DATE.match(str(step['value'])):
+        return True
+    return False
+
+
+def step_ops(step):
+    return getattr(ops, step['action'])(**step_args(step))
+
+
+def split(steps):
+    # runs of scripted and native fields, in page order, since a later field
+    # may only appear once an earlier one is filled
+    runs = []
+    for step in steps:
+        native = is_native(step)
+        if not runs or runs[-1][0] != native:
+            runs.append((native, []))
+        if native:
+            runs[-1][1].extend(step_ops(step))
+            continue
+        name = step.get('label') or step.get('content') or step['action']
+        runs[-1][1].append([name, [
+            {'kind': op.kind, 'selector': op.selector,
+             'value': None if op.value is None else str(op.value),
+             'message': op.message}
+            for op in step_ops(step)]])
+    return runs
@@ -0,0 +1,91 @@
+import argparse
+import itertools
+import json
+import statistics
+import time
+from urllib.parse import urlencode
+import standin
+from main import TestExamples
+
+
+def drive(case, url, spec):
+    case.driver.get(url)
+    case.wait.until(lambda driver: driver.title == spec['title'])
+    case.next()
+    for step in range(len(spec['steps'])):
+        for helper, label, value, kwargs in standin.fields_for(spec, step):
+            getattr(case, helper)(label, value, False, **kwargs)
+        case.next()
+    case.expect_text('All steps done', False)
+
+
+def run_case(base_url, steps, fields, delay, repeat):
+    spec = standin.form_spec(steps, fields, delay)
+    url = f"{base_url}/?{urlencode({'steps': steps, 'fields': fields, 'delay': delay})}"
+    case = TestExamples()
+    case.setUp()
+    try:
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            drive(case, url, spec)
+            durations.append(time.perf_counter() - start)
+        latencies = {}
+        for span in case.tracer.spans:
+            if span.depth == 0 and span.end is not None:
+                latencies.setdefault(span.name, []).append(span.duration)
+    finally:
+        case.tearDown()
+    elapsed = statistics.median(durations)
+    return {
+        'steps': steps,
+        'fields': fields,
+        'delay': delay,
+        'seconds': elapsed,
+        'steps_per_second': (steps + 1) / elapsed,
+        'helpers': {
+            name: {'count': len(values),
+                   'mean_ms': statistics.mean(values) * 1000,
+                   'max_ms': max(values) * 1000}
+            for name, values in sorted(latencies.items())},
+    }
+
+
+def report(results):
+    lines = [f"{'steps':>5} {'fields':>6} {'delay':>5} {'seconds':>8} {'steps/s':>8}  slowest helper"]
+    for result in results:
+        name, stats = max(result['helpers'].items(),
+                          key=lambda item: item[1]['mean_ms'], default=('-', {'mean_ms': 0}))
+        lines.append(
+            f"{result['steps']:5d} {result['fields']:6d} {result['delay']:5d} "
+            f"{result['seconds']:8.3f} {result['steps_per_second']:8.2f}  "
+            f"{name} {stats['mean_ms']:.1f}ms")
+    return '\n'.join(lines)
+
+
+def numbers(value):
+    return [int(part) for part in value.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measure harness speed against the local stand-in form server.')
+    parser.add_argument('--steps', type=numbers, default=[5, 20])
+    parser.add_argument('--fields', type=numbers, default=[1, 4, 8])
+    parser.add_argument('--delay', type=numbers, default=[0, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='address the browser can reach this machine on')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    server, base_url = standin.serve(args.host)
+    try:
+        results = [run_case(base_url, steps, fields, delay, args.repeat)
+                   for steps, fields, delay in itertools.product(args.steps, args.fields, args.delay)]
+    finally:
+        server.shutdown()
+    print(report(results))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
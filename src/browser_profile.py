@@ -0,0 +1,70 @@
+import os
+from urllib.parse import urlparse
+from cdp import cdp
+
+EXAMPLE_DOMAIN = os.getenv("ABSTRA_EXAMPLE_DOMAIN", "https://examples.abstra.run")
+SELENIUM_URL = os.getenv("ABSTRA_SELENIUM_URL")
+FAST_PROFILE = os.getenv("ABSTRA_FAST_PROFILE", "").lower() in ("1", "true", "yes")
+
+# Hosts whose assets must always load. When ABSTRA_ALLOWED_HOSTS is set,
+# every other host is unresolvable inside the browser.
+ALLOWED_HOSTS = [host.strip() for host in os.getenv(
+    "ABSTRA_ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+FAST_ARGUMENTS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    "--blink-settings=imagesEnabled=false",
+    "--window-size=1280,900",
+]
+
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hubspot.com*", "*hs-scripts.com*", "*hs-analytics.net*", "*hsforms.net*",
+    "*calendar.google.com*", "*facebook.net*", "*hotjar.com*",
+    "*segment.io*", "*segment.com*", "*intercom.io*", "*sentry.io*",
+]
+
+
+def allowed_hosts(example_domain=None):
+    hosts = list(ALLOWED_HOSTS)
+    if example_domain:
+        hosts.append(urlparse(example_domain).hostname)
+    return hosts
+
+
+def apply_options(options, example_domain=None):
+    for argument in FAST_ARGUMENTS:
+        options.add_argument(argument)
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+    })
+    if ALLOWED_HOSTS:
+        excluded = ", ".join(f"EXCLUDE {host}" for host in
+                             allowed_hosts(example_domain) + ["localhost", "127.0.0.1"])
+        options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {excluded}")
+    return options
+
+
+def blocked_urls(example_domain=None):
+    hosts = allowed_hosts(example_domain)
+    return [pattern for pattern in BLOCKED_URLS
+            if not any(host in pattern for host in hosts)]
+
+
+def apply_blocking(driver, example_domain=None):
+    cdp(driver, "Network.enable")
+    cdp(driver, "Network.setBlockedURLs", {"urls": blocked_urls(example_domain)})
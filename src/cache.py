@@ -0,0 +1,121 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+import time
+from functools import lru_cache
+import plan
+import protocol
+import ws
+
+CACHE_FILE = os.getenv(
+    "ABSTRA_CACHE_FILE",
+    os.path.join(os.path.dirname(__file__), ".abstra-cache", "results.json"))
+# the fingerprint only covers the first page, so results age out quickly
+TTL = float(os.getenv("ABSTRA_CACHE_TTL", str(3600)))
+MAX_ENTRIES = int(os.getenv("ABSTRA_CACHE_SIZE", "500"))
+FORM_ID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+def test_source(test):
+    method = getattr(test, test._testMethodName)
+    flow = getattr(method, 'flow', None)
+    if flow:
+        with open(os.path.join(plan.FLOWS_DIR, f'{flow}.json')) as f:
+            return f.read()
+    return inspect.getsource(inspect.unwrap(method))
+
+
+def flow_hash(test):
+    return hashlib.sha256(test_source(test).encode()).hexdigest()
+
+
+def form_id(test):
+    match = FORM_ID.search(test_source(test))
+    return match.group(0) if match else None
+
+
+class FingerprintError(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def fingerprint(form_id):
+    # The served page is the same app shell for every form, and the
+    # runtime's form metadata has no version or program source, so the
+    # only form-specific signal is what the program sends. This hashes the
+    # first page of a fresh run (nothing is submitted). Changes on later
+    # pages go unnoticed until the cached result expires (ABSTRA_CACHE_TTL).
+    if not protocol.RUNTIME_URL:
+        raise FingerprintError('ABSTRA_RUNTIME_URL is not set, so forms cannot be fingerprinted')
+    runner = protocol.ProtocolRunner(protocol.RUNTIME_URL, timeout=10)
+    try:
+        runner.open(form_id)
+        runner.next()
+        page = {key: runner.form.get(key) for key in ('widgets', 'actions', 'endProgram')}
+    except (AssertionError, OSError, ValueError, ws.ConnectionClosed) as error:
+        raise FingerprintError(f'Could not fingerprint form {form_id}: {error}') from error
+    finally:
+        runner.close()
+    return hashlib.sha256(json.dumps(page, sort_keys=True).encode()).hexdigest()
+
+
+def key_for(test):
+    identifier = form_id(test)
+    form = fingerprint(identifier) if identifier else 'no-form'
+    return hashlib.sha256(
+        f'{test.id()}\0{flow_hash(test)}\0{form}'.encode()).hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, path=CACHE_FILE, ttl=TTL, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def passed(self, key):
+        entry = self.entries.get(key)
+        return bool(entry) and time.time() - entry['passed_at'] < self.ttl
+
+    def store(self, key, test_id):
+        self.entries[key] = {'test': test_id, 'passed_at': time.time()}
+
+    def evict(self):
+        now = time.time()
+        fresh = {key: entry for key, entry in self.entries.items()
+                 if now - entry['passed_at'] < self.ttl}
+        newest = sorted(fresh.items(), key=lambda item: item[1]['passed_at'], reverse=True)
+        self.entries = dict(newest[:self.max_entries])
+
+    def save(self):
+        self.evict()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+
+
+def select_changed(tests, cache):
+    changed, unchanged, keys = [], [], {}
+    for test in tests:
+        key = keys[test.id()] = key_for(test)
+        if cache.passed(key):
+            unchanged.append(test)
+        else:
+            changed.append(test)
+    return changed, unchanged, keys
+
+
+def record(result, tests, keys, cache):
+    failed = {test.id() for test, _ in result.failures + result.errors + result.skipped}
+    for test in tests:
+        key = keys.get(test.id())
+        if key and test.id() not in failed:
+            cache.store(key, test.id())
+    cache.save()
@@ -0,0 +1,334 @@
+import base64
+import collections
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import cdp
+import tracing
+
+# ABSTRA_CASSETTE=record captures each test's HTTP and websocket traffic,
+# ABSTRA_CASSETTE=replay serves it back from disk without touching the network.
+MODE = os.getenv("ABSTRA_CASSETTE", "").lower()
+CASSETTE_DIR = os.getenv(
+    "ABSTRA_CASSETTE_DIR", os.path.join(os.path.dirname(__file__), "cassettes"))
+BLOB_DIR = os.path.join(CASSETTE_DIR, "blobs")
+# let requests missing from the cassette reach the network instead of failing them
+PASSTHROUGH = os.getenv("ABSTRA_CASSETTE_PASSTHROUGH", "").lower() in ("1", "true", "yes")
+
+# query params that differ between runs (cache busters, clocks) and are
+# left out when matching requests, e.g. ABSTRA_CASSETTE_IGNORE_PARAMS=_,t
+IGNORED_PARAMS = set(filter(None, os.getenv(
+    "ABSTRA_CASSETTE_IGNORE_PARAMS", "_,t,timestamp").split(',')))
+
+# bodies are stored decoded, so the encoding headers no longer apply
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+# Replaces WebSocket with a scripted peer that plays back the recorded
+# frames. Frames the page sends are checked against the recording and
+# mismatches are reported through the abstraDiverged binding.
+SOCKET_JS = """
+(function (conversations) {
+  const report = (detail) => window.abstraDiverged && window.abstraDiverged(JSON.stringify(detail));
+  const path = (url) => url.split('?')[0];
+  // exact url first, then ignoring the query, which may carry session ids
+  const take = (url) => {
+    let found = conversations.findIndex((c) => c.url === url);
+    if (found < 0) found = conversations.findIndex((c) => path(c.url) === path(url));
+    return found < 0 ? null : conversations.splice(found, 1)[0].frames.slice();
+  };
+  const same = (a, b) => {
+    try { return JSON.stringify(JSON.parse(a)) === JSON.stringify(JSON.parse(b)); }
+    catch (e) { return a === b; }
+  };
+  const decode = (data, binaryType) => {
+    const bytes = Uint8Array.from(atob(data), (c) => c.charCodeAt(0));
+    return binaryType === 'arraybuffer' ? bytes.buffer : new Blob([bytes]);
+  };
+
+  class ReplaySocket extends EventTarget {
+    constructor(url) {
+      super();
+      this.url = String(url);
+      this.protocol = '';
+      this.extensions = '';
+      this.binaryType = 'blob';
+      this.bufferedAmount = 0;
+      this.readyState = 0;
+      this.frames = take(this.url);
+      if (!this.frames) report({url: this.url, error: 'websocket was not recorded'});
+      setTimeout(() => {
+        if (!this.frames) {
+          this.readyState = 3;
+          this.emit(new Event('error'));
+          this.emit(new CloseEvent('close', {code: 1006}));
+          return;
+        }
+        this.readyState = 1;
+        this.emit(new Event('open'));
+        this.flush();
+      });
+    }
+    emit(event) {
+      this.dispatchEvent(event);
+      const handler = this['on' + event.type];
+      if (typeof handler === 'function') handler.call(this, event);
+    }
+    flush() {
+      const frame = this.frames[0];
+      if (this.readyState !== 1 || !frame || frame[0] !== 'received') return;
+      this.frames.shift();
+      const data = frame[2] === 2 ? decode(frame[1], this.binaryType) : frame[1];
+      this.emit(new MessageEvent('message', {data, origin: new URL(this.url).origin}));
+      setTimeout(() => this.flush());
+    }
+    send(data) {
+      if (this.readyState !== 1) throw new DOMException('WebSocket is not open', 'InvalidStateError');
+      const frame = this.frames[0];
+      if (frame && frame[0] === 'sent') {
+        this.frames.shift();
+        if (typeof data === 'string' && !same(frame[1], data)) {
+          report({url: this.url, expected: frame[1], actual: data});
+        }
+      } else {
+        report({url: this.url, unexpected: typeof data === 'string' ? data : '<binary>'});
+      }
+      setTimeout(() => this.flush());
+    }
+    close(code) {
+      if (this.readyState >= 2) return;
+      this.readyState = 3;
+      setTimeout(() => this.emit(new CloseEvent('close', {code: code || 1000, wasClean: true})));
+    }
+  }
+  ['CONNECTING', 'OPEN', 'CLOSING', 'CLOSED'].forEach((name, value) => {
+    ReplaySocket[name] = value;
+    ReplaySocket.prototype[name] = value;
+  });
+  window.WebSocket = ReplaySocket;
+})
+"""
+
+
+def path_for(test_id):
+    return os.path.join(CASSETTE_DIR, f'{tracing.safe_name(test_id)}.json')
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def store_blob(data):
+    # content addressed, so assets shared between forms are stored once
+    name = digest(data)
+    path = os.path.join(BLOB_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(BLOB_DIR, exist_ok=True)
+        handle, partial = tempfile.mkstemp(dir=BLOB_DIR, suffix='.partial')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(gzip.compress(data, mtime=0))
+        os.replace(partial, path)
+    return name
+
+
+def load_blob(name):
+    with open(os.path.join(BLOB_DIR, name), 'rb') as f:
+        return gzip.decompress(f.read())
+
+
+def url_path(url):
+    return url.split('?', 1)[0].split('#', 1)[0]
+
+
+def normalize(url):
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if name not in IGNORED_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query), fragment=''))
+
+
+def request_key(request):
+    body = request.get('postData')
+    return (request['method'], request['url'], digest(body.encode()) if body else None)
+
+
+class Recorder:
+
+    def __init__(self, session, test_id):
+        self.session = session
+        self.test_id = test_id
+        self.requests = []
+        self.sockets = {}
+        session.on('Fetch.requestPaused', self.paused)
+        session.on('Network.webSocketCreated', self.socket_created)
+        session.on('Network.webSocketFrameSent', lambda event: self.frame(event, 'sent'))
+        session.on('Network.webSocketFrameReceived', lambda event: self.frame(event, 'received'))
+        session.send('Network.enable')
+        # with the cache on, what gets recorded depends on earlier tests in the pool
+        session.send('Network.setCacheDisabled', {'cacheDisabled': True})
+        session.send('Fetch.enable', {'patterns': [{'urlPattern': '*', 'requestStage': 'Response'}]})
+
+    def paused(self, event):
+        method, url, body = request_key(event['request'])
+        entry = {'method': method, 'url': url, 'request': body}
+        try:
+            if event.get('responseErrorReason'):
+                entry['error'] = event['responseErrorReason']
+                return
+            entry['status'] = event['responseStatusCode']
+            entry['headers'] = [header for header in event.get('responseHeaders', [])
+                                if header['name'].lower() not in DROPPED_HEADERS]
+            try:
+                response = self.session.send('Fetch.getResponseBody', {'requestId': event['requestId']})
+            except cdp.CdpError:
+                # redirects have no body
+                return
+            data = response['body']
+            data = base64.b64decode(data) if response['base64Encoded'] else data.encode()
+            entry['body'] = store_blob(data)
+        finally:
+            self.requests.append(entry)
+            self.session.send('Fetch.continueRequest', {'requestId': event['requestId']})
+
+    def socket_created(self, event):
+        self.sockets[event['requestId']] = {'url': event['url'], 'frames': []}
+
+    def frame(self, event, direction):
+        socket = self.sockets.get(event['requestId'])
+        if socket is not None:
+            response = event['response']
+            socket['frames'].append([direction, response['payloadData'], response['opcode']])
+
+    def stop(self):
+        self.session.send('Fetch.disable')
+        self.session.drain()
+        self.session.send('Network.setCacheDisabled', {'cacheDisabled': False})
+        self.session.send('Network.disable')
+        os.makedirs(CASSETTE_DIR, exist_ok=True)
+        with open(path_for(self.test_id), 'w') as f:
+            json.dump({
+                'test': self.test_id,
+                'recorded_at': time.time(),
+                'requests': self.requests,
+                'sockets': list(self.sockets.values()),
+            }, f, separators=(',', ':'))
+        return []
+
+
+class Replayer:
+
+    def __init__(self, session, test_id):
+        self.session = session
+        with open(path_for(test_id)) as f:
+            recording = json.load(f)
+        self.responses = collections.defaultdict(collections.deque)
+        self.by_path = collections.defaultdict(collections.deque)
+        for entry in recording['requests']:
+            self.responses[self.key(entry['method'], entry['url'], entry['request'])].append(entry)
+            if entry['method'] == 'GET':
+                self.by_path[url_path(entry['url'])].append(entry)
+        self.divergences = []
+        self.warnings = []
+        session.on('Fetch.requestPaused', self.paused)
+        session.on('Runtime.bindingCalled', self.diverged)
+        session.send('Runtime.enable')
+        session.send('Runtime.addBinding', {'name': 'abstraDiverged'})
+        session.send('Network.enable')
+        session.send('Network.setCacheDisabled', {'cacheDisabled': True})
+        self.script = session.send('Page.addScriptToEvaluateOnNewDocument', {
+            'source': f"{SOCKET_JS}({json.dumps(recording['sockets'])});"})['identifier']
+        session.send('Fetch.enable', {'patterns': [{'urlPattern': '*', 'requestStage': 'Request'}]})
+
+    @staticmethod
+    def key(method, url, body):
+        return method, normalize(url), body
+
+    def paused(self, event):
+        method, url, body = request_key(event['request'])
+        queue = self.responses.get(self.key(method, url, body))
+        if not queue and method == 'GET':
+            # a read with another query still gets an answer, but the
+            # difference is reported; requests with a body never fall back,
+            # they carry the answers the flow submits
+            queue = self.by_path.get(url_path(url))
+            if queue:
+                self.warnings.append(f"GET {url} answered with the recording of {queue[0]['url']}")
+        if not queue:
+            recorded = any(key[0] == method and url_path(key[1]) == url_path(url)
+                           for key in self.responses)
+            self.divergences.append(f'{method} {url} was not recorded' + (
+                ' with this query and body' if recorded else ''))
+            if PASSTHROUGH:
+                self.session.send('Fetch.continueRequest', {'requestId': event['requestId']})
+            else:
+                self.session.send('Fetch.failRequest', {
+                    'requestId': event['requestId'], 'errorReason': 'InternetDisconnected'})
+            return
+        # the last response for a url keeps answering repeated polls
+        entry = queue.popleft() if len(queue) > 1 else queue[0]
+        # and is not served again through the other index
+        for other in (self.responses[self.key(entry['method'], entry['url'], entry['request'])],
+                      self.by_path[url_path(entry['url'])]):
+            if other is not queue and len(other) > 1 and entry in other:
+                other.remove(entry)
+        if entry.get('error'):
+            self.session.send('Fetch.failRequest', {
+                'requestId': event['requestId'], 'errorReason': entry['error']})
+            return
+        params = {'requestId': event['requestId'], 'responseCode': entry['status'],
+                  'responseHeaders': entry['headers']}
+        if entry.get('body'):
+            params['body'] = base64.b64encode(load_blob(entry['body'])).decode()
+        self.session.send('Fetch.fulfillRequest', params)
+
+    def diverged(self, event):
+        if event['name'] != 'abstraDiverged':
+            return
+        detail = json.loads(event['payload'])
+        if 'error' in detail:
+            self.divergences.append(f"websocket {detail['url']}: {detail['error']}")
+        elif 'unexpected' in detail:
+            self.divergences.append(
+                f"websocket {detail['url']} sent {detail['unexpected'][:200]} after the recording ended")
+        else:
+            self.divergences.append(
+                f"websocket {detail['url']} sent {detail['actual'][:200]}, "
+                f"recorded {detail['expected'][:200]}")
+
+    def stop(self):
+        self.session.send('Fetch.disable')
+        self.session.drain()
+        self.session.send('Page.removeScriptToEvaluateOnNewDocument', {'identifier': self.script})
+        self.session.send('Runtime.removeBinding', {'name': 'abstraDiverged'})
+        self.session.send('Network.setCacheDisabled', {'cacheDisabled': False})
+        self.session.send('Network.disable')
+        for warning in self.warnings:
+            print(f'cassette: {warning}', file=sys.stderr)
+        return self.divergences
+
+
+class Cassette:
+
+    def __init__(self, driver, test_id, mode=MODE):
+        self.session = cdp.connect(driver)
+        try:
+            self.tape = (Recorder if mode == 'record' else Replayer)(self.session, test_id)
+        except BaseException:
+            self.session.close()
+            raise
+
+    def stop(self):
+        try:
+            return self.tape.stop()
+        finally:
+            self.session.close()
+
+
+def start(driver, test_id):
+    if MODE not in ('record', 'replay'):
+        return None
+    return Cassette(driver, test_id)
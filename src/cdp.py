@@ -0,0 +1,121 @@
+import itertools
+import json
+import queue
+import threading
+import urllib.request
+import ws
+
+
+def cdp(driver, cmd, params=None):
+    # works for local Chrome and for Chrome sessions behind a remote grid
+    response = driver.execute(
+        "executeCdpCommand", {"cmd": cmd, "params": params or {}})
+    return response["value"]
+
+
+class CdpError(Exception):
+    pass
+
+
+def devtools_url(driver):
+    # a grid hands out its CDP proxy, local chromedriver its debugger port
+    capabilities = driver.capabilities
+    if capabilities.get('se:cdp'):
+        return capabilities['se:cdp']
+    address = capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+    if not address:
+        raise CdpError('Browser does not expose a DevTools endpoint')
+    with urllib.request.urlopen(f'http://{address}/json/version', timeout=10) as response:
+        return json.load(response)['webSocketDebuggerUrl']
+
+
+class CdpSession:
+    # A DevTools connection of our own, for domains that need events
+    # (Fetch, Network) which executeCdpCommand cannot deliver. Events are
+    # handled on a separate thread so handlers may send commands.
+
+    def __init__(self, url, target_id, timeout=30):
+        self.socket = ws.connect(url, timeout)
+        self.socket.sock.settimeout(None)
+        self.timeout = timeout
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.handlers = {}
+        self.events = queue.Queue()
+        self.lock = threading.Lock()
+        self.session_id = None
+        self.listener = threading.Thread(target=self.listen, daemon=True)
+        self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+        self.listener.start()
+        self.dispatcher.start()
+        self.session_id = self.send(
+            'Target.attachToTarget', {'targetId': target_id, 'flatten': True})['sessionId']
+
+    def on(self, method, handler):
+        self.handlers[method] = handler
+
+    def send(self, method, params=None):
+        if self.session_id and not self.listener.is_alive():
+            raise CdpError(f'{method}: DevTools connection closed')
+        message = {'id': next(self.ids), 'method': method, 'params': params or {}}
+        if self.session_id:
+            message['sessionId'] = self.session_id
+        done = threading.Event()
+        self.pending[message['id']] = reply = [done, None]
+        with self.lock:
+            self.socket.send_json(message)
+        if not done.wait(self.timeout):
+            self.pending.pop(message['id'], None)
+            raise CdpError(f'{method} timed out')
+        response = reply[1]
+        if 'error' in response:
+            raise CdpError(f"{method}: {response['error'].get('message')}")
+        return response.get('result', {})
+
+    def listen(self):
+        try:
+            while True:
+                message = self.socket.recv_json()
+                if 'id' in message:
+                    reply = self.pending.pop(message['id'], None)
+                    if reply:
+                        reply[1] = message
+                        reply[0].set()
+                elif message.get('sessionId') == self.session_id:
+                    self.events.put(message)
+        except (ws.ConnectionClosed, OSError, ValueError):
+            for reply in list(self.pending.values()):
+                reply[1] = {'error': {'message': 'DevTools connection closed'}}
+                reply[0].set()
+        finally:
+            self.events.put(None)
+
+    def dispatch(self):
+        while True:
+            message = self.events.get()
+            if message is None:
+                return
+            if isinstance(message, threading.Event):
+                message.set()
+                continue
+            handler = self.handlers.get(message['method'])
+            if handler:
+                try:
+                    handler(message['params'])
+                except CdpError:
+                    pass
+
+    def drain(self):
+        # waits until every event received so far has been handled
+        done = threading.Event()
+        self.events.put(done)
+        done.wait(self.timeout)
+
+    def close(self):
+        self.socket.close()
+        self.dispatcher.join(self.timeout)
+
+
+def connect(driver):
+    # chromedriver window handles are DevTools target ids
+    return CdpSession(devtools_url(driver), driver.current_window_handle)
@@ -0,0 +1,245 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from urllib.parse import urlencode
+import standin
+
+FIXTURE_DIR = os.getenv(
+    "ABSTRA_FIXTURE_DIR", os.path.join(tempfile.gettempdir(), "abstra-fixtures"))
+# bump when the generated content changes so cached files are rebuilt
+VERSION = 1
+
+COLUMNS = [
+    ('date', 'date'),
+    ('description', 'text'),
+    ('amount', 'number'),
+    ('category', 'text'),
+    ('balance', 'number'),
+]
+CATEGORIES = ['Salary', 'Dividends', 'Interest', 'Rent', 'Refund']
+# zip entries get a fixed timestamp so the same parameters give the same bytes
+ZIP_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def columns_for(count):
+    header = []
+    for i in range(count):
+        name, kind = COLUMNS[i % len(COLUMNS)]
+        header.append((name if i < len(COLUMNS) else f'{name}_{i // len(COLUMNS)}', kind))
+    return header
+
+
+def table(rows, columns, seed):
+    generator = random.Random(seed)
+    start = date(2022, 1, 1)
+    header = columns_for(columns)
+    values = []
+    for row in range(rows):
+        line = []
+        for name, kind in header:
+            if kind == 'date':
+                line.append((start + timedelta(days=row % 365)).isoformat())
+            elif kind == 'number':
+                line.append(round(generator.uniform(-1000, 5000), 2))
+            elif name.startswith('category'):
+                line.append(generator.choice(CATEGORIES))
+            else:
+                line.append(f'Income {row} {generator.getrandbits(32):08x}')
+        values.append(line)
+    return [name for name, _ in header], values
+
+
+def escape(value):
+    return (str(value).replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('"', '&quot;'))
+
+
+def cell_ref(row, column):
+    letters = ''
+    column += 1
+    while column:
+        column, rest = divmod(column - 1, 26)
+        letters = chr(65 + rest) + letters
+    return f'{letters}{row + 1}'
+
+
+def write_zip(f, parts):
+    with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts:
+            archive.writestr(zipfile.ZipInfo(name, ZIP_TIME), content, zipfile.ZIP_DEFLATED)
+
+
+def write_csv(f, header, values):
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(header)
+    writer.writerows(values)
+    f.write(text.getvalue().encode())
+
+
+def write_xlsx(f, header, values):
+    rows = []
+    for r, line in enumerate([header] + values):
+        cells = ''.join(
+            f'<c r="{cell_ref(r, c)}"><v>{value}</v></c>'
+            if isinstance(value, (int, float)) else
+            f'<c r="{cell_ref(r, c)}" t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+            for c, value in enumerate(line))
+        rows.append(f'<row r="{r + 1}">{cells}</row>')
+    main = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    relationships = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    write_zip(f, [
+        ('[Content_Types].xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+         '<Default Extension="xml" ContentType="application/xml"/>'
+         '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+         '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+         '</Types>'),
+        ('_rels/.rels',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         f'<Relationship Id="rId1" Type="{relationships}/officeDocument" Target="xl/workbook.xml"/>'
+         '</Relationships>'),
+        ('xl/workbook.xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         f'<workbook xmlns="{main}" xmlns:r="{relationships}">'
+         '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+        ('xl/_rels/workbook.xml.rels',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         f'<Relationship Id="rId1" Type="{relationships}/worksheet" Target="worksheets/sheet1.xml"/>'
+         '</Relationships>'),
+        ('xl/worksheets/sheet1.xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         f'<worksheet xmlns="{main}"><sheetData>{"".join(rows)}</sheetData></worksheet>'),
+    ])
+
+
+def write_docx(f, header, values):
+    def row(line):
+        cells = ''.join(f'<w:tc><w:p><w:r><w:t>{escape(value)}</w:t></w:r></w:p></w:tc>'
+                        for value in line)
+        return f'<w:tr>{cells}</w:tr>'
+    body = ''.join(row(line) for line in [header] + values)
+    write_zip(f, [
+        ('[Content_Types].xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+         '<Default Extension="xml" ContentType="application/xml"/>'
+         '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+         '</Types>'),
+        ('_rels/.rels',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+         '</Relationships>'),
+        ('word/document.xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+         f'<w:body><w:tbl>{body}</w:tbl></w:body></w:document>'),
+    ])
+
+
+WRITERS = {'xlsx': write_xlsx, 'csv': write_csv, 'docx': write_docx}
+
+
+def render(kind, rows, columns, seed):
+    f = io.BytesIO()
+    WRITERS[kind](f, *table(rows, columns, seed))
+    return f.getvalue()
+
+
+def fixture(kind='xlsx', rows=100, columns=5, size=0, seed=0):
+    # size is a lower bound in bytes; rows grow until the file reaches it
+    if kind not in WRITERS:
+        raise ValueError(f'Unknown fixture kind {kind!r}, expected one of {sorted(WRITERS)}')
+    params = json.dumps([VERSION, kind, rows, columns, size, seed])
+    digest = hashlib.sha256(params.encode()).hexdigest()[:16]
+    path = os.path.join(FIXTURE_DIR, f'{kind}-{rows}x{columns}-{digest}.{kind}')
+    if os.path.exists(path):
+        return path
+
+    content = render(kind, rows, columns, seed)
+    while len(content) < size:
+        rows = max(rows + 1, math.ceil(rows * size / len(content) * 1.05))
+        content = render(kind, rows, columns, seed)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    # parallel workers may build the same fixture, so publish it atomically
+    handle, partial = tempfile.mkstemp(dir=FIXTURE_DIR, suffix='.partial')
+    with os.fdopen(handle, 'wb') as f:
+        f.write(content)
+    os.replace(partial, path)
+    return path
+
+
+def sweep(case, base_url, kind, sizes, upload_limit=None):
+    results = []
+    query = {'steps': 1, 'fields': 1, 'kinds': 'file-input', 'title': 'Upload sweep'}
+    if upload_limit:
+        query['upload_limit'] = upload_limit
+    url = f"{base_url}/?{urlencode(query)}"
+    for size in sizes:
+        path = fixture(kind, size=size)
+        case.driver.get(url)
+        case.wait.until(lambda driver: driver.title == 'Upload sweep')
+        case.next()
+        try:
+            case.fill_file('Step 0 field 0', path, False, index='1')
+        except AssertionError as error:
+            results.append({'size': size, 'error': str(error)})
+            break
+        results.append(case.perf.uploads[-1])
+    return results
+
+
+def report(results):
+    lines = [f"{'bytes':>12} {'seconds':>8} {'MB/s':>8}"]
+    for result in results:
+        if 'error' in result:
+            lines.append(f"{result['size']:12d} failed: {result['error']}")
+        else:
+            lines.append(f"{result['bytes']:12d} {result['seconds']:8.3f} "
+                         f"{result['bytes_per_s'] / 2**20:8.2f}")
+    return '\n'.join(lines)
+
+
+def sizes(value):
+    return [int(float(part)) for part in value.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Upload generated fixtures of growing size to the stand-in form.')
+    parser.add_argument('--kind', choices=sorted(WRITERS), default='xlsx')
+    parser.add_argument('--sizes', type=sizes, default=[10**4, 10**5, 10**6, 10**7, 5 * 10**7])
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='address the browser can reach this machine on')
+    parser.add_argument('--upload-limit', type=int,
+                        help='make the stand-in reject uploads above this many bytes')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    from main import TestExamples
+    server, base_url = standin.serve(args.host)
+    case = TestExamples()
+    case.setUp()
+    try:
+        results = sweep(case, base_url, args.kind, args.sizes, args.upload_limit)
+    finally:
+        case.tearDown()
+        server.shutdown()
+    print(report(results))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,145 @@
+import argparse
+import itertools
+import json
+import math
+import threading
+import time
+import unittest
+import main
+import perf
+import retry
+from main import TestExamples
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class LoadStats:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.steps = {}
+        self.iterations = []
+        self.errors = {}
+
+    def record(self, test_name, case, result, duration):
+        with self.lock:
+            self.iterations.append((test_name, duration, result.wasSuccessful()))
+            for _, message in result.failures + result.errors:
+                line = message.strip().splitlines()[-1]
+                self.errors[line] = self.errors.get(line, 0) + 1
+            tracer = getattr(case, 'tracer', None)
+            for span in tracer.spans if tracer else []:
+                if span.depth == 0 and span.end is not None:
+                    # the same helper on different fields is a different step
+                    key = (span.name, span.args.get('label'))
+                    self.steps.setdefault(key, []).append(span.duration)
+
+    def report(self, elapsed, users):
+        total = len(self.iterations)
+        failed = sum(1 for _, _, ok in self.iterations if not ok)
+        durations = [duration for _, duration, _ in self.iterations]
+        return {
+            'users': users,
+            'elapsed': elapsed,
+            'iterations': total,
+            'throughput': total / elapsed if elapsed else 0.0,
+            'steps_per_second': sum(len(v) for v in self.steps.values()) / elapsed if elapsed else 0.0,
+            'error_rate': failed / total if total else 0.0,
+            'iteration_latency': latency(durations),
+            'steps': {step_name(*key): latency(values) for key, values in sorted(
+                self.steps.items(), key=lambda item: (item[0][0], item[0][1] or ''))},
+            'errors': dict(sorted(self.errors.items(), key=lambda item: -item[1])),
+        }
+
+
+def step_name(name, label):
+    return f'{name} {label}' if label else name
+
+
+def latency(values):
+    return {
+        'count': len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'max': max(values) if values else 0.0,
+    }
+
+
+def virtual_user(names, stats, deadline, iterations):
+    for count, name in enumerate(itertools.cycle(names)):
+        if iterations is not None and count >= iterations:
+            return
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        case = TestExamples(name)
+        result = unittest.TestResult()
+        start = time.perf_counter()
+        case.run(result)
+        stats.record(name, case, result, time.perf_counter() - start)
+
+
+def run(names, users, duration=None, iterations=None):
+    # measure what users would get: a failed step is an error rather than
+    # retried or resumed, and a blown budget is not a functional error
+    retry.RETRIES, retry.LIMITS, retry.MAX_RESUMES = 0, {}, 0
+    perf.ENFORCE = False
+    stats = LoadStats()
+    deadline = time.monotonic() + duration if duration else None
+    threads = [threading.Thread(target=virtual_user, args=(
+        names[index % len(names):] + names[:index % len(names)], stats, deadline, iterations))
+        for index in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.report(time.perf_counter() - start, users)
+
+
+def format_report(report):
+    lines = [
+        f"users={report['users']} iterations={report['iterations']} "
+        f"elapsed={report['elapsed']:.1f}s throughput={report['throughput']:.2f}/s "
+        f"steps={report['steps_per_second']:.2f}/s errors={report['error_rate']:.1%}",
+        '',
+        f"{'step':<48} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}",
+    ]
+    rows = list(report['steps'].items()) + [('(iteration)', report['iteration_latency'])]
+    for name, stats in rows:
+        lines.append(
+            f"{name[:48]:<48} {stats['count']:6d} {stats['p50']:8.3f} {stats['p95']:8.3f} "
+            f"{stats['p99']:8.3f} {stats['max']:8.3f}")
+    for message, count in report['errors'].items():
+        lines.append(f"{count:6d} x {message}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Run TestExamples flows as concurrent virtual users.')
+    parser.add_argument('tests', nargs='+', help='test method names, e.g. test_simple_quiz')
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--duration', type=float, help='seconds to keep generating load')
+    parser.add_argument('--iterations', type=int, help='flows each user runs')
+    parser.add_argument('--base-url', default=main.EXAMPLE_DOMAIN,
+                        help='deployment serving the forms')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    args = parser.parse_args()
+    if args.duration is None and args.iterations is None:
+        parser.error('one of --duration or --iterations is required')
+
+    main.EXAMPLE_DOMAIN = main.POOL.example_domain = args.base_url.rstrip('/')
+    for name in args.tests:
+        if not hasattr(TestExamples, name):
+            parser.error(f'unknown test {name}')
+    report = run(args.tests, args.users, args.duration, args.iterations)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -1,209 +1,339 @@
+import argparse
 import os
+import sys
+import time
 import unittest
-from selenium import webdriver
+from selenium.common.exceptions import (
+    JavascriptException, StaleElementReferenceException, TimeoutException)
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-
-EXAMPLE_DOMAIN = "https://examples.abstra.run"
-ABSTRA_SELENIUM_URL = os.getenv("ABSTRA_SELENIUM_URL")
+from pool import DriverPool
+import batch
+import browser_profile
+import cache
+import cassette
+import cdp
+import fixtures
+import monitor
+import ops
+import parallel
+import perf
+import plan
+import retry
+import snapshot
+import tables
+import tracing
+import waits
+from perf import budget
+from retry import checkpointed
+from browser_profile import EXAMPLE_DOMAIN
+from tracing import TracedWait, traced
+
+POOL = DriverPool(browser_profile.SELENIUM_URL, browser_profile.FAST_PROFILE, EXAMPLE_DOMAIN)
 
 
 class TestExamples(unittest.TestCase):
 
     def setUp(self) -> None:
-        if ABSTRA_SELENIUM_URL:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--no-sandbox")
-            self.driver = webdriver.Remote(
-                command_executor=ABSTRA_SELENIUM_URL, options=options)
-        else:
-            self.driver = webdriver.Chrome()
-        self.wait = WebDriverWait(self.driver, 15)
+        if cassette.MODE == 'replay' and not os.path.exists(cassette.path_for(self.id())):
+            self.skipTest('no cassette recorded')
+        self.driver = POOL.acquire()
+        self.driver.set_script_timeout(waits.script_timeout())
+        self.tracer = tracing.Tracer(self.id())
+        self.tracer.attach(self.driver)
+        self.perf = perf.PageMetrics()
+        self.perf.enable(self.driver)
+        self.resources = monitor.sample(self.driver)
+        self.index = snapshot.StepIndex(self.driver)
+        self.started = time.perf_counter()
+        self.journal = []
+        self.checkpoint_depth = 0
+        self.replaying = False
+        self.resumes = 0
+        self.wait = self.waiter('title')
+        try:
+            self.cassette = cassette.start(self.driver, self.id())
+        except (cdp.CdpError, OSError):
+            POOL.release(self.driver)
+            raise
 
     def tearDown(self) -> None:
-        self.driver.quit()
-
-    def check_if_exists(self, selector):
+        self.driver.abstra_tracer = None
+        self.tracer.finish()
+        try:
+            divergences = self.cassette.stop() if self.cassette else []
+        finally:
+            # a bloated browser stalls waits into false timeouts, start over
+            if monitor.record(self.id(), self.driver, self.resources):
+                POOL.recycle(self.driver)
+            else:
+                POOL.release(self.driver)
+        if divergences:
+            self.fail('Flow diverged from its cassette:\n' + '\n'.join(divergences))
+
+    def waiter(self, helper=None, timeout=None):
+        return TracedWait(self.driver, timeout or waits.timeout(helper),
+                          self.tracer, poll_frequency=0.1)
+
+    @traced
+    def check_if_exists(self, selector, timeout=None):
+        timeout = timeout or waits.timeout()
+        try:
+            elem, timed_out = self.driver.execute_async_script(
+                waits.WAIT_SCRIPT, selector, int(timeout * 1000), waits.SETTLE_MS)
+            if elem:
+                self.perf.rendered()
+            return elem or (waits.TIMED_OUT if timed_out else False)
+        except JavascriptException:
+            pass
         try:
-            elem = self.wait.until(
+            elem = self.waiter(timeout=timeout).until(
                 EC.presence_of_element_located((By.XPATH, selector)))
+            self.perf.rendered()
             return elem
+        except TimeoutException:
+            return waits.TIMED_OUT
         except:
             return False
         # finally:
         #     self.driver.save_screenshot('screen.png')
 
+    def locate(self, op, timeout):
+        with self.tracer.phase('locate'):
+            elem = self.index.resolve(op.locator)
+        if elem:
+            return elem
+        elem = self.check_if_exists(op.selector, timeout)
+        # the step changed since the snapshot was taken
+        self.index.invalidate()
+        return elem
+
+    def missing(self, elem, message):
+        # only a step that was still changing when the wait gave up is
+        # worth retrying; one that settled without the element is a failure
+        if elem is waits.TIMED_OUT:
+            raise TimeoutException(message)
+        self.fail(message)
+
+    def act(self, op, timeout, action):
+        elem = self.locate(op, timeout)
+        if not elem:
+            self.missing(elem, op.message)
+        try:
+            action(elem)
+        except StaleElementReferenceException:
+            self.index.invalidate()
+            elem = self.check_if_exists(op.selector, timeout)
+            if not elem:
+                self.missing(elem, op.message)
+            action(elem)
+
+    def perform(self, steps, helper=None):
+        timeout = waits.timeout(helper)
+        for op in steps:
+            if op.kind == 'batch':
+                # fill_many appends to field values, so it is never replayed blindly
+                self.fill_many(op.value, next=False)
+            else:
+                retry.with_retries(self, lambda: self.perform_op(op, timeout, helper))
+
+    def perform_op(self, op, timeout, helper):
+        if op.kind == 'wait':
+            self.locate(op, timeout)
+        elif op.kind == 'find':
+            elem = self.locate(op, timeout)
+            if not elem:
+                self.missing(elem, op.message)
+        elif op.kind == 'find_all':
+            elem = self.locate(op, timeout)
+            if not elem:
+                missing = [o.message for o in op.value
+                           if not self.driver.find_elements(By.XPATH, o.selector)]
+                self.missing(elem, '; '.join(missing) or 'Page did not render')
+        elif op.kind == 'type':
+            self.act(op, timeout, lambda elem: elem.send_keys(op.value))
+        elif op.kind == 'click':
+            self.act(op, timeout, lambda elem: elem.click())
+            if op.locator and op.locator[0] == 'dropdown':
+                self.index.invalidate()
+        elif op.kind == 'click_when_clickable':
+            elem = self.waiter(helper).until(
+                EC.element_to_be_clickable((By.XPATH, op.selector)))
+            elem.click()
+            self.index.invalidate(new_step=True)
+            self.perf.clicked()
+        elif op.kind == 'call':
+            getattr(self, op.selector)(next=False, **op.value)
+            self.index.invalidate()
+
+    @checkpointed
+    @traced
+    def fill_many(self, fields, next=True):
+        for native, run in batch.split(fields):
+            if native:
+                self.perform(run, 'fill_many')
+                continue
+            errors = self.driver.execute_async_script(
+                batch.FILL_MANY_SCRIPT, run,
+                int(waits.timeout('fill_many') * 1000), waits.SETTLE_MS)
+            # the script waited for the fields, so the step has rendered
+            self.perf.rendered()
+            self.index.invalidate()
+            if errors:
+                message = '\n'.join(error for error, _ in errors)
+                if any(timed_out for _, timed_out in errors):
+                    raise TimeoutException(message)
+                self.fail(message)
+        if next:
+            self.next()
+
+    @checkpointed
+    @traced
     def expect_text(self, content, next=True):
-        selector = f'//div[contains(@class,"text") and contains(.,"{content}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Text {content} not found')
+        self.perform(ops.expect_text(content), 'expect_text')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def expect_link(self, content, url, next=True):
-        selector = f'//a[contains(@href,"{url}") and contains(.,"{content}")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'Link {content} not found')
+        self.perform(ops.expect_link(content, url), 'expect_link')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def expect_file(self, content, downloadUrl, next=True):
-        selector = f'//a[contains(@href, "{downloadUrl}") and contains(.,"{content}")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'File {content} not found')
+        self.perform(ops.expect_file(content, downloadUrl), 'expect_file')
         if next:
             self.next()
 
-    def expect_panda_table(self, columns, next=True):
-        for index, column in enumerate(columns):
-            selector = f'//table/thead/tr/th[{index+2}]'
-            elem = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, selector)))
-            self.assertIn(column, elem.text)
+    @checkpointed
+    @traced
+    def expect_panda_table(self, columns, next=True, rows=None, tolerance=1e-6, pager=None):
+        timeout = waits.timeout('expect_panda_table')
+        elem = self.check_if_exists('//table/thead/tr/th', timeout)
+        if not elem:
+            self.missing(elem, 'Table not found')
+        problems = tables.verify(self.driver, columns, rows, tolerance, pager, timeout)
+        if problems:
+            self.fail('\n'.join(problems))
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_text(self, label, value, next=True, placeholder="Your answer here", type="text-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        selector = f'//div[contains(@id, "{type+index}")]//input[contains(@class,"input") and contains(@placeholder,"{placeholder}")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'Text input not found')
-        elem.send_keys(value)
+        self.perform(ops.fill_text(label, value, placeholder, type, index), 'fill_text')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_textarea(self, label, value, next=True, placeholder="Your answer here", type="textarea-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        self.check_if_exists(selector)
-        selector = f'//div[contains(@id, "{type+index}")]//textarea[contains(@class,"input") and contains(@placeholder,"{placeholder}")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'TextArea input not found')
-        elem.send_keys(value)
+        self.perform(ops.fill_textarea(label, value, placeholder, type, index), 'fill_textarea')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_phone(self, label, value, next=True, placeholder="(000)000-0000", type="phone-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        selector = f'//div[contains(@id, "{type+index}")]//input[contains(@class,"input") and contains(@placeholder,"{placeholder}")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'Phone input not found')
-        elem.send_keys(value)
+        self.perform(ops.fill_phone(label, value, placeholder, type, index), 'fill_phone')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_date(self, label, value, next=True, type="date-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        selector = f'//div[contains(@id, "{type+index}")]//input[contains(@class,"input") and contains(@type,"date")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'Date input not found')
-        elem.send_keys(value)
+        self.perform(ops.fill_date(label, value, type, index), 'fill_date')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_option(self, label, value, next=True, buttonText="Next", type="multiple-choice-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        if buttonText:
-            selector = f'//div[contains(@id, "{type+index}")]//div[contains(@class,"radiobox") and contains(.,"{value}")]'
-            elem = self.check_if_exists(selector)
-            if elem is False:
-                self.fail(f'Option {value} not found')
-            elem.click()
-            if next:
-                self.next()
-        else:
-            selector = f'//div[contains(@class,"multiple-choice-button") and contains(.,"{value}")]'
-            elem = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, selector)))
-            elem.click()
+        self.perform(ops.fill_option(label, value, buttonText, type, index), 'fill_option')
+        if buttonText and next:
+            self.next()
 
+    @checkpointed
+    @traced
     def fill_multiple_options(self, label, values, next=True, type="multiple-choice-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        for value in values:
-            selector = f'//div[contains(@id, "{type+index}")]//div[contains(@class,"checkbox") and contains(.,"{value}")]'
-            elem = self.check_if_exists(selector)
-            if elem is False:
-                self.fail(f'Option {value} not found')
-            elem.click()
+        self.perform(ops.fill_multiple_options(label, values, type, index), 'fill_multiple_options')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_dropdown(self, label, value, next=True, type="dropdown-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        selector = f'//div[contains(@id, "{type+index}")]//div[contains(@class, "v-select")]'
-        elem = self.check_if_exists(selector)
-        elem.click()
-        if elem is False:
-            self.fail(f'Dropdown Button {value} not found')
-        selector = f'//li[contains(@class,"vs__dropdown-option") and contains(.,"{value}")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'Dropdown Option {value} not found')
-        elem.click()
+        self.perform(ops.fill_dropdown(label, value, type, index), 'fill_dropdown')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_card(self, label, value, next=True, type="cards-input", index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        selector = f'//div[contains(@id, "{type+index}")]//h3[contains(@class,"card-title") and contains(.,"{value}")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'Card {value} not found')
-        elem.click()
+        self.perform(ops.fill_card(label, value, type, index), 'fill_card')
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def fill_file(self, label, value,  next=True, type='file-input', index="0"):
-        selector = f'//div[contains(@class,"label") and contains(.,"{label}")]'
-        response = self.check_if_exists(selector)
-        if response is False:
-            self.fail(f'Label {label} not found')
-        selector = f'//div[contains(@id, "{type+index}")]//input[contains(@class,"input") and contains(@type,"file")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'File input not found')
-        elem.send_keys(value)
-        selector = f'//div[contains(@id, "{type+index}")]//div[contains(@class,"filename")]'
-        elem = self.check_if_exists(selector)
-        if elem is False:
-            self.fail(f'Could not upload file')
-
+        check_label, send, shown = ops.fill_file(label, value, type, index)
+        self.perform([check_label], 'fill_file')
+        elem = self.locate(send, waits.timeout('fill_file'))
+        if not elem:
+            self.missing(elem, send.message)
+        # from send_keys until the form shows the uploaded filename
+        start = time.perf_counter()
+        with self.tracer.span('upload', file=os.path.basename(value)):
+            elem.send_keys(send.value)
+            self.perform([shown], 'fill_file')
+        self.perf.uploaded(value, time.perf_counter() - start)
         if next:
             self.next()
 
+    @checkpointed
+    @traced
     def next(self):
-        elem = self.wait.until(EC.element_to_be_clickable(
+        retry.with_retries(self, self.click_next)
+
+    def click_next(self):
+        elem = self.waiter('next').until(EC.element_to_be_clickable(
             (By.CLASS_NAME, 'next-button')))
+        if self.perf.first_next_ms is None:
+            self.perf.first_next_ms = self.driver.execute_script(
+                'return performance.now()')
         elem.click()
+        self.index.invalidate(new_step=True)
+        self.perf.clicked()
+
+    def check_budget(self, limits):
+        metrics = self.perf.collect(self.driver)
+        perf.record(self.id(), metrics)
+        problems = perf.violations(limits, metrics)
+        if problems and perf.ENFORCE:
+            self.fail('Performance budget exceeded: ' + '; '.join(problems))
+
+    def run_flow(self, name):
+        flow = plan.load(name)
+        self.driver.get(f"{EXAMPLE_DOMAIN}/{flow.form_id}")
+        self.wait.until(EC.title_is(flow.title))
+        self.next()
 
+        for number, page in enumerate(flow.pages):
+            with self.tracer.span('page', label=f'{name} #{number}'):
+                self.perform_page(page.ops)
+                if page.advance == 'next':
+                    self.next()
+
+    @checkpointed
+    def perform_page(self, ops):
+        # journaled as one entry so a resume refills the pages before it
+        self.perform(ops)
+
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=4000, heap_mb=60)
     def test_purchase_requester(self):  # ✅
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/f036497f-4069-4010-b7a8-2ebed126d872")
@@ -225,6 +355,7 @@ class TestExamples(unittest.TestCase):
         self.expect_text(
             "We've registered this expense succesfully. Thanks! See ya next time.", False)
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=4000, heap_mb=60)
     def test_simple_quiz(self):  # ✅
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/8e174c9a-ffe7-44fe-9950-ceafbd7c4bec")
@@ -250,37 +381,7 @@ class TestExamples(unittest.TestCase):
         self.expect_link('Try Abstra Cloud free now', 'abstracloud.com')
         self.expect_text('Thank you', False)
 
-    def test_buying_intention_form(self):  # ✅
-        self.driver.get(
-            f"{EXAMPLE_DOMAIN}/2ef3700b-9d75-49bb-9c60-7924a0cb8c19")
-        self.wait.until(EC.title_is('Upgrade Abstra Cloud'))
-        self.next()
-
-        self.expect_text(
-            'Thank you for showing interest in our standard plan. We need some informations to get in touch.')
-        self.fill_text('Name', 'Abstra Bot')
-        self.fill_text('Email', 'email@abstra.app',
-                       placeholder="Your email here", type='email-input')
-        self.fill_text('Company name', 'Abstra')
-        self.expect_text(
-            "We've got your information, we'll get in contact soon! 😉", False)
-
-    def test_subscribe_to_feature(self):  # ✅
-        self.driver.get(
-            f"{EXAMPLE_DOMAIN}/b871dce9-8a1d-4511-aa64-cc857e7a3950")
-        self.wait.until(EC.title_is('Subscribe to Feature'))
-        self.next()
-
-        self.expect_text(
-            'Hi there. Thanks for your interest in our upcoming features!')
-        self.expect_text(
-            "We're almost ready to launch. Let's sign you up to get the news first-hand.")
-        self.fill_text('Firstly, what is your first name?', 'Abstra')
-        self.fill_text('What is your last name?', 'Bot')
-        self.fill_text("Great! What's your email?", 'email@abstra.app')
-        self.expect_text(
-            "All set, Abstra! You'll be notified as soon as we launch 😎🚀", False)
-
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=5000, heap_mb=60)
     def test_dev_marketplace(self):  # ✅
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/33ddb3d0-af07-4f35-84fb-65e30125fd06")
@@ -304,6 +405,7 @@ class TestExamples(unittest.TestCase):
         self.expect_link('If you have any questions, you can get in touch with us here.',
                          'https://meetings.hubspot.com/sophia-faria/abstra-cloud-onboarding')
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=4000, heap_mb=60)
     def test_tax_calculator(self):  # ✅ / ❌
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/cbdc145f-608d-4a13-a796-641f728aa6ee")
@@ -311,12 +413,14 @@ class TestExamples(unittest.TestCase):
         self.next()
 
         self.expect_text('Hello! Fill in the data below:', False)
-        self.fill_text('Invoice value without taxes (BRL)',
-                       '100', False, index="1")
-        self.fill_text('Cofins (%)', '5', False, index="2")
-        self.fill_text('Csll (%)', '5', False, index="3")
-        self.fill_text('Irpj (%)', '25', False, index="4")
-        self.fill_text('Pis (%)', '10', index="5")
+        self.fill_many([
+            {'action': 'fill_text', 'label': 'Invoice value without taxes (BRL)',
+             'value': '100', 'index': "1"},
+            {'action': 'fill_text', 'label': 'Cofins (%)', 'value': '5', 'index': "2"},
+            {'action': 'fill_text', 'label': 'Csll (%)', 'value': '5', 'index': "3"},
+            {'action': 'fill_text', 'label': 'Irpj (%)', 'value': '25', 'index': "4"},
+            {'action': 'fill_text', 'label': 'Pis (%)', 'value': '10', 'index': "5"},
+        ])
         self.expect_text(
             'Invoice value with taxes: R$ 181.82', False)
         self.expect_text('Cofins: R$ 9.09', False)
@@ -324,6 +428,7 @@ class TestExamples(unittest.TestCase):
         self.expect_text('Irpj: R$ 45.45', False)
         self.expect_text('Pis: R$ 18.18')
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=4000, heap_mb=60)
     def test_vacation_approval(self):  # ❌
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/842f9872-59fd-4735-8b9a-4e6f5065a96e")
@@ -342,6 +447,7 @@ class TestExamples(unittest.TestCase):
         self.expect_link("Click here to add Abby's vacation to your calendar",
                          'https://calendar.google.com/calendar/render?action=TEMPLATE&dates=20220818%2F20220902&details=Enjoy%21&text=Abby%27s+Vacation')
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=10000, heap_mb=80, upload_ms=20000)
     def test_insert_saving_incomes(self):  # ❌
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/9636b0b4-7cdc-4ae7-9762-8f939555d2f9")
@@ -349,11 +455,11 @@ class TestExamples(unittest.TestCase):
         self.next()
 
         self.expect_text('Hey there.')
-        self.fill_file('Upload your .xlsx file',
-                       '/Users/leonardoribeiro/Downloads/tests-example.xls')
+        self.fill_file('Upload your .xlsx file', fixtures.fixture('xlsx', rows=50))
         self.expect_text(
             "All your savings income info has been inputed. Simple as that", False)
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=5000, heap_mb=80)
     def test_self_checkin(self):  # ❌
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/b0a39028-1988-42c8-b04b-b230c70c9bb3")
@@ -411,6 +517,7 @@ class TestExamples(unittest.TestCase):
         self.expect_text(
             "Thanks, Abstra Bot! You're checked in and ready to go.", False)
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=6000, heap_mb=80)
     def test_invoice_factoring_calculator(self):  # ❌
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/56aee472-37a9-49e7-8f4b-9460c84dbc92")
@@ -438,6 +545,7 @@ class TestExamples(unittest.TestCase):
         self.expect_text(
             'The amount payable for this invoice is $510.0.', False)
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=10000, heap_mb=60)
     def test_certificate_maker(self):  # ❌
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/82f4a14b-1494-4818-8455-cb6c76af08eb")
@@ -458,6 +566,7 @@ class TestExamples(unittest.TestCase):
         self.expect_text('All done! Your certificate is ready! 🧑‍🎓', False)
         self.expect_file('Download here', 'generated_certificate.docx')
 
+    @budget(load_ms=4000, first_next_ms=6000, step_render_ms=4000, heap_mb=60)
     def test_customer_registration(self):  # ❌
         self.driver.get(
             f"{EXAMPLE_DOMAIN}/81e15ebb-40bf-444e-8c83-35aafbc033b9")
@@ -466,17 +575,63 @@ class TestExamples(unittest.TestCase):
 
         self.fill_option(
             'Hello! Before continuing, what would you like to do?', 'Register a new customer',)
-        self.fill_text('Name', 'Abstra', False, index="0")
-        self.fill_text('Email', 'email@abstra.app', False,
-                       'Your email here', 'email-input', "1")
-        self.fill_dropdown('Legal entity', 'Physical', False, index="2")
-        self.fill_dropdown('Payment Frequency', 'Monthly', False, index="3")
-        self.fill_dropdown('Payment Method', 'Credit card', False, index="4")
-        self.fill_text('Country', 'Brazil', False, index="5")
-        self.fill_date('Registration date', '2020-01-01', index="6")
+        self.fill_many([
+            {'action': 'fill_text', 'label': 'Name', 'value': 'Abstra', 'index': "0"},
+            {'action': 'fill_text', 'label': 'Email', 'value': 'email@abstra.app',
+             'placeholder': 'Your email here', 'type': 'email-input', 'index': "1"},
+            {'action': 'fill_dropdown', 'label': 'Legal entity',
+             'value': 'Physical', 'index': "2"},
+            {'action': 'fill_dropdown', 'label': 'Payment Frequency',
+             'value': 'Monthly', 'index': "3"},
+            {'action': 'fill_dropdown', 'label': 'Payment Method',
+             'value': 'Credit card', 'index': "4"},
+            {'action': 'fill_text', 'label': 'Country', 'value': 'Brazil', 'index': "5"},
+            {'action': 'fill_date', 'label': 'Registration date',
+             'value': '2020-01-01', 'index': "6"},
+        ])
         self.expect_text(
             'Perfecto. Your new customer has been registered 😎', False)
 
 
+def flow_test(name):
+    def test(self):
+        self.run_flow(name)
+    test.flow = name
+    limits = plan.load_spec(name).get('budget')
+    return budget(**limits)(test) if limits else test
+
+
+for name in plan.flow_names():
+    setattr(TestExamples, f'test_{name}', flow_test(name))
+
+
 if __name__ == '__main__':
-    unittest.main()
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument(
+        '--changed-only', action='store_true',
+        help='skip tests that passed since their flow and the first page of their form '
+             'last changed; needs ABSTRA_RUNTIME_URL and starts each form once to compare')
+    args, names = parser.parse_known_args()
+    if args.workers or args.changed_only:
+        loader = unittest.defaultTestLoader
+        if names:
+            suite = loader.loadTestsFromNames(names, sys.modules[__name__])
+        else:
+            suite = loader.loadTestsFromTestCase(TestExamples)
+        tests = list(parallel.iter_tests(suite))
+        if args.changed_only:
+            results = cache.ResultCache()
+            try:
+                tests, unchanged, keys = cache.select_changed(tests, results)
+            except cache.FingerprintError as error:
+                parser.error(f'--changed-only: {error}')
+            print(f'Skipping {len(unchanged)} unchanged tests that passed before', file=sys.stderr)
+        if args.workers:
+            result = parallel.run(tests, args.workers)
+        else:
+            result = unittest.TextTestRunner().run(unittest.TestSuite(tests))
+        if args.changed_only:
+            cache.record(result, tests, keys, results)
+        sys.exit(not result.wasSuccessful())
+    unittest.main(argv=[sys.argv[0]] + names)
@@ -0,0 +1,124 @@
+import atexit
+import json
+import os
+from cdp import cdp
+from pool import DRIVER_ERRORS
+
+# A session whose end-of-test sample crosses any of these is quit instead
+# of going back to the pool, e.g. ABSTRA_MAX_HEAP_MB=300.
+LIMITS = {key: float(os.environ[name]) for key, name in (
+    ('heap_mb', 'ABSTRA_MAX_HEAP_MB'),
+    ('dom_nodes', 'ABSTRA_MAX_DOM_NODES'),
+    ('rss_mb', 'ABSTRA_MAX_RSS_MB'),
+) if os.getenv(name)}
+REPORT_FILE = os.getenv("ABSTRA_RESOURCE_REPORT")
+
+RESULTS = {}
+RECYCLED = []
+
+
+def process_usage(root):
+    # rss and cpu of every process below chromedriver, read from /proc
+    stats = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stats[int(entry)] = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+    children = {}
+    for pid, fields in stats.items():
+        children.setdefault(int(fields[1]), []).append(pid)
+    rss = cpu = 0
+    pending = list(children.get(root, []))
+    while pending:
+        pid = pending.pop()
+        fields = stats[pid]
+        cpu += int(fields[11]) + int(fields[12])
+        rss += int(fields[21])
+        pending.extend(children.get(pid, []))
+    return rss * os.sysconf('SC_PAGE_SIZE'), cpu / os.sysconf('SC_CLK_TCK')
+
+
+def browser_pid(driver):
+    # only local drivers have a service process; grid nodes are out of reach
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return process.pid if process else None
+
+
+def sample(driver):
+    values = {}
+    try:
+        metrics = {item['name']: item['value']
+                   for item in cdp(driver, "Performance.getMetrics")['metrics']}
+        values['heap_mb'] = metrics.get('JSHeapUsedSize', 0) / 2**20
+        values['dom_nodes'] = metrics.get('Nodes')
+        values['listeners'] = metrics.get('JSEventListeners')
+        values['task_s'] = metrics.get('TaskDuration')
+    except DRIVER_ERRORS as error:
+        # the browser is gone or wedged, either way the session is done
+        values['error'] = f'{type(error).__name__}: {str(error).strip()[:200]}'
+    pid = browser_pid(driver)
+    if pid and os.path.isdir('/proc'):
+        rss, cpu = process_usage(pid)
+        values['rss_mb'] = rss / 2**20
+        values['cpu_s'] = cpu
+    return values
+
+
+def exceeded(values):
+    return [f'{key} {values[key]:.0f} > {limit:.0f}' for key, limit in LIMITS.items()
+            if values.get(key) is not None and values[key] > limit]
+
+
+def delta(start, end, key):
+    # cumulative counters, so a test's share is the difference
+    if start.get(key) is None or end.get(key) is None:
+        return None
+    return end[key] - start[key]
+
+
+def record(test_id, driver, start):
+    end = sample(driver)
+    driver.abstra_tests = getattr(driver, 'abstra_tests', 0) + 1
+    RESULTS[test_id] = {
+        'start': start,
+        'end': end,
+        'session_tests': driver.abstra_tests,
+        'cpu_s': delta(start, end, 'cpu_s'),
+        'task_s': delta(start, end, 'task_s'),
+    }
+    reasons = exceeded(end)
+    if 'error' in end:
+        reasons.append(f"sampling failed ({end['error']})")
+    if reasons:
+        RECYCLED.append((test_id, driver.abstra_tests, reasons))
+    return reasons
+
+
+def summary():
+    lines = [f"{'heap MB':>8} {'nodes':>7} {'RSS MB':>8} {'CPU s':>6} {'tests':>5}  test"]
+    for test_id, result in RESULTS.items():
+        end = result['end']
+        lines.append(
+            f"{end.get('heap_mb') or 0:8.1f} {end.get('dom_nodes') or 0:7.0f} "
+            f"{end.get('rss_mb') or 0:8.1f} {result['cpu_s'] or 0:6.2f} "
+            f"{result['session_tests']:5d}  {test_id.rsplit('.', 1)[-1]}")
+    for test_id, tests, reasons in RECYCLED:
+        lines.append(f"recycled the session after {test_id.rsplit('.', 1)[-1]} "
+                     f"({tests} tests): {', '.join(reasons)}")
+    return '\n'.join(lines)
+
+
+def write_report():
+    if REPORT_FILE:
+        with open(REPORT_FILE, 'w') as f:
+            json.dump({'limits': LIMITS, 'tests': RESULTS,
+                       'recycled': RECYCLED}, f, indent=2, sort_keys=True)
+    if RESULTS and (LIMITS or REPORT_FILE):
+        print(f"\nBrowser resources:\n{summary()}")
+
+
+atexit.register(write_report)
@@ -0,0 +1,128 @@
+from collections import namedtuple
+from functools import lru_cache
+
+# kind is one of:
+#   wait       wait for the element, ignore a miss
+#   find       wait for the element, fail with message on a miss
+#   find_all   wait until every selector in value matches
+#   type       find, then send value as keystrokes
+#   click      find, then click
+#   click_when_clickable
+#   call       invoke the helper named by selector with value as kwargs
+#   batch      fill every step in value with a single script call
+#
+# locator describes the same element structurally so it can be resolved
+# against a step snapshot (see snapshot.py) before falling back to XPath.
+Op = namedtuple('Op', 'kind selector value message locator', defaults=(None, None, None))
+
+
+@lru_cache(maxsize=None)
+def label_xpath(label):
+    return f'//div[contains(@class,"label") and contains(.,"{label}")]'
+
+
+@lru_cache(maxsize=None)
+def text_xpath(content):
+    return f'//div[contains(@class,"text") and contains(.,"{content}")]'
+
+
+@lru_cache(maxsize=None)
+def link_xpath(content, url):
+    return f'//a[contains(@href,"{url}") and contains(.,"{content}")]'
+
+
+@lru_cache(maxsize=None)
+def widget_xpath(type, index, inner):
+    return f'//div[contains(@id, "{type+index}")]{inner}'
+
+
+def expect_label(label, required=True):
+    return Op('find' if required else 'wait', label_xpath(label), None,
+              f'Label {label} not found', ('label', label))
+
+
+def expect_text(content):
+    return [Op('find', text_xpath(content), None, f'Text {content} not found', ('text', content))]
+
+
+def expect_link(content, url):
+    return [Op('find', link_xpath(content, url), None, f'Link {content} not found',
+               ('link', content, url))]
+
+
+def expect_file(content, downloadUrl):
+    return [Op('find', link_xpath(content, downloadUrl), None, f'File {content} not found',
+               ('link', content, downloadUrl))]
+
+
+def fill_text(label, value, placeholder="Your answer here", type="text-input", index="0"):
+    selector = widget_xpath(
+        type, index, f'//input[contains(@class,"input") and contains(@placeholder,"{placeholder}")]')
+    return [expect_label(label), Op('type', selector, value, 'Text input not found',
+                                    ('input', type + index, 'input', 'placeholder', placeholder))]
+
+
+def fill_textarea(label, value, placeholder="Your answer here", type="textarea-input", index="0"):
+    selector = widget_xpath(
+        type, index, f'//textarea[contains(@class,"input") and contains(@placeholder,"{placeholder}")]')
+    return [expect_label(label, required=False), Op('type', selector, value, 'TextArea input not found',
+                                                    ('input', type + index, 'textarea', 'placeholder', placeholder))]
+
+
+def fill_phone(label, value, placeholder="(000)000-0000", type="phone-input", index="0"):
+    selector = widget_xpath(
+        type, index, f'//input[contains(@class,"input") and contains(@placeholder,"{placeholder}")]')
+    return [expect_label(label), Op('type', selector, value, 'Phone input not found',
+                                    ('input', type + index, 'input', 'placeholder', placeholder))]
+
+
+def fill_date(label, value, type="date-input", index="0"):
+    selector = widget_xpath(
+        type, index, '//input[contains(@class,"input") and contains(@type,"date")]')
+    return [expect_label(label), Op('type', selector, value, 'Date input not found',
+                                    ('input', type + index, 'input', 'type', 'date'))]
+
+
+def fill_option(label, value, buttonText="Next", type="multiple-choice-input", index="0"):
+    if buttonText:
+        selector = widget_xpath(
+            type, index, f'//div[contains(@class,"radiobox") and contains(.,"{value}")]')
+        return [expect_label(label), Op('click', selector, None, f'Option {value} not found',
+                                        ('choice', type + index, 'radiobox', value))]
+    selector = f'//div[contains(@class,"multiple-choice-button") and contains(.,"{value}")]'
+    return [expect_label(label), Op('click_when_clickable', selector)]
+
+
+def fill_multiple_options(label, values, type="multiple-choice-input", index="0"):
+    return [expect_label(label)] + [
+        Op('click', widget_xpath(
+            type, index, f'//div[contains(@class,"checkbox") and contains(.,"{value}")]'),
+           None, f'Option {value} not found', ('choice', type + index, 'checkbox', value))
+        for value in values]
+
+
+def fill_dropdown(label, value, type="dropdown-input", index="0"):
+    return [
+        expect_label(label),
+        Op('click', widget_xpath(type, index, '//div[contains(@class, "v-select")]'),
+           None, f'Dropdown Button {value} not found', ('dropdown', type + index)),
+        Op('click', f'//li[contains(@class,"vs__dropdown-option") and contains(.,"{value}")]',
+           None, f'Dropdown Option {value} not found', ('dropdown-option', value)),
+    ]
+
+
+def fill_card(label, value, type="cards-input", index="0"):
+    selector = widget_xpath(
+        type, index, f'//h3[contains(@class,"card-title") and contains(.,"{value}")]')
+    return [expect_label(label), Op('click', selector, None, f'Card {value} not found',
+                                    ('card', type + index, value))]
+
+
+def fill_file(label, value, type='file-input', index="0"):
+    return [
+        expect_label(label),
+        Op('type', widget_xpath(type, index, '//input[contains(@class,"input") and contains(@type,"file")]'),
+           value, 'File input not found', ('input', type + index, 'input', 'type', 'file')),
+        Op('find', widget_xpath(type, index, '//div[contains(@class,"filename")]'),
+           None, 'Could not upload file', ('filename', type + index)),
+    ]
@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+DURATIONS_FILE = os.getenv(
+    "ABSTRA_DURATIONS_FILE",
+    os.path.join(os.path.dirname(__file__), ".test_durations.json"))
+DEFAULT_DURATION = 30.0
+
+
+def load_durations(path=DURATIONS_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(durations, path=DURATIONS_FILE):
+    with open(path, "w") as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+
+
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+def shard(tests, workers, durations):
+    # longest processing time first: always feed the lightest shard
+    known = [d for d in durations.values()]
+    fallback = sum(known) / len(known) if known else DEFAULT_DURATION
+    weighted = sorted(
+        tests, key=lambda t: durations.get(t.id(), fallback), reverse=True)
+    shards = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    for test in weighted:
+        lightest = loads.index(min(loads))
+        shards[lightest].append(test)
+        loads[lightest] += durations.get(test.id(), fallback)
+    return [s for s in shards if s]
+
+
+class TimedResult(unittest.TestResult):
+
+    def __init__(self):
+        super().__init__()
+        self.durations = {}
+        self._started = {}
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started[test.id()] = time.perf_counter()
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.durations[test.id()] = time.perf_counter() - \
+            self._started.pop(test.id())
+
+
+def run_shard(tests):
+    result = TimedResult()
+    for test in tests:
+        test(result)
+    return result
+
+
+def merge(results, stream, verbosity):
+    merged = unittest.TextTestRunner(stream=stream, verbosity=verbosity)._makeResult()
+    for result in results:
+        merged.testsRun += result.testsRun
+        merged.failures.extend(result.failures)
+        merged.errors.extend(result.errors)
+        merged.skipped.extend(result.skipped)
+        merged.expectedFailures.extend(result.expectedFailures)
+        merged.unexpectedSuccesses.extend(result.unexpectedSuccesses)
+    return merged
+
+
+def run(suite, workers, verbosity=1, stream=sys.stderr):
+    tests = list(iter_tests(suite))
+    durations = load_durations()
+    shards = shard(tests, workers, durations)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(shards) or 1) as executor:
+        results = list(executor.map(run_shard, shards))
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        durations.update(result.durations)
+    save_durations(durations)
+
+    merged = merge(results, stream, verbosity)
+    merged.printErrors()
+    stream.write(merged.separator2 + "\n")
+    stream.write(
+        f"Ran {merged.testsRun} tests in {elapsed:.3f}s "
+        f"across {len(shards)} workers\n\n")
+    if merged.wasSuccessful():
+        stream.write("OK\n")
+    else:
+        stream.write(
+            f"FAILED (failures={len(merged.failures)}, errors={len(merged.errors)})\n")
+    return merged
@@ -0,0 +1,116 @@
+import atexit
+import functools
+import json
+import os
+import time
+from selenium.common.exceptions import WebDriverException
+from cdp import cdp
+
+ENFORCE = os.getenv("ABSTRA_BUDGETS", "1").lower() not in ("0", "false", "no")
+REPORT_FILE = os.getenv("ABSTRA_PERF_REPORT")
+
+PAGE_METRICS_SCRIPT = """
+const [navigation] = performance.getEntriesByType('navigation');
+return {
+  navigation: navigation ? navigation.toJSON() : null,
+  heap: performance.memory ? performance.memory.usedJSHeapSize : null,
+};
+"""
+
+# Budget keys and where their value comes from. Any other key is looked up
+# in the Performance.getMetrics counters, e.g. Nodes=5000 or LayoutCount=200.
+BUDGET_KEYS = {
+    'load_ms': "navigation load time",
+    'dom_ready_ms': "navigation DOMContentLoaded time",
+    'first_next_ms': "time until the first next button is clickable",
+    'step_render_ms': "slowest step render after next()",
+    'heap_mb': "JS heap in use",
+    'upload_ms': "slowest file upload",
+}
+
+RESULTS = {}
+
+
+def budget(**limits):
+    def decorate(test):
+        @functools.wraps(test)
+        def wrapper(self):
+            test(self)
+            self.check_budget(limits)
+        wrapper.budget = limits
+        return wrapper
+    return decorate
+
+
+class PageMetrics:
+
+    def __init__(self):
+        self.first_next_ms = None
+        self.step_renders = []
+        self.uploads = []
+        self._clicked = None
+
+    def clicked(self):
+        self._clicked = time.perf_counter()
+
+    def rendered(self):
+        if self._clicked is not None:
+            self.step_renders.append((time.perf_counter() - self._clicked) * 1000)
+            self._clicked = None
+
+    def uploaded(self, path, seconds):
+        size = os.path.getsize(path) if os.path.exists(path) else None
+        self.uploads.append({
+            'file': os.path.basename(path),
+            'bytes': size,
+            'seconds': seconds,
+            'bytes_per_s': size / seconds if size and seconds else None,
+        })
+
+    def enable(self, driver):
+        try:
+            cdp(driver, "Performance.enable")
+        except WebDriverException:
+            pass
+
+    def collect(self, driver):
+        page = driver.execute_script(PAGE_METRICS_SCRIPT)
+        navigation = page.get('navigation') or {}
+        metrics = {
+            'load_ms': navigation.get('loadEventEnd'),
+            'dom_ready_ms': navigation.get('domContentLoadedEventEnd'),
+            'first_next_ms': self.first_next_ms,
+            'step_render_ms': max(self.step_renders) if self.step_renders else None,
+            'step_renders_ms': self.step_renders,
+            'heap_mb': page['heap'] / 2**20 if page.get('heap') else None,
+            'upload_ms': max(u['seconds'] for u in self.uploads) * 1000 if self.uploads else None,
+            'uploads': self.uploads,
+        }
+        try:
+            counters = cdp(driver, "Performance.getMetrics")['metrics']
+            metrics['cdp'] = {item['name']: item['value'] for item in counters}
+        except WebDriverException:
+            metrics['cdp'] = {}
+        return metrics
+
+
+def violations(limits, metrics):
+    found = []
+    for key, limit in limits.items():
+        value = metrics.get(key) if key in BUDGET_KEYS else metrics['cdp'].get(key)
+        if value is not None and value > limit:
+            found.append(f'{BUDGET_KEYS.get(key, key)} {value:.1f} > {limit}')
+    return found
+
+
+def record(test_id, metrics):
+    RESULTS[test_id] = metrics
+
+
+def write_report():
+    with open(REPORT_FILE, 'w') as f:
+        json.dump(RESULTS, f, indent=2, sort_keys=True)
+
+
+if REPORT_FILE:
+    atexit.register(write_report)
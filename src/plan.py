@@ -0,0 +1,124 @@
+import json
+import os
+from collections import namedtuple
+from functools import lru_cache
+import ops
+from ops import Op
+
+FLOWS_DIR = os.path.join(os.path.dirname(__file__), 'flows')
+
+# advance is 'next' when the page ends with a click on the next button,
+# 'auto' when the last step moves the form forward by itself (e.g. a
+# multiple-choice button) and None on the last page of a flow.
+Page = namedtuple('Page', 'ops steps advance')
+Plan = namedtuple('Plan', 'name form_id title pages')
+
+PRESENCE_ONLY = {'expect_text', 'expect_link', 'expect_file'}
+
+
+def flow_names(directory=FLOWS_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name[:-len('.json')] for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def load_spec(name, directory=FLOWS_DIR):
+    with open(os.path.join(directory, f'{name}.json')) as f:
+        spec = json.load(f)
+    spec.setdefault('name', name)
+    return spec
+
+
+@lru_cache(maxsize=None)
+def load(name, directory=FLOWS_DIR):
+    return compile_flow(load_spec(name, directory))
+
+
+def step_args(step):
+    return {k: v for k, v in step.items() if k not in ('action', 'next')}
+
+
+def ends_page(step):
+    if step['action'] == 'fill_option' and step.get('buttonText', 'Next') is None:
+        return 'auto'
+    if step.get('next', True):
+        return 'next'
+    return None
+
+
+def split_pages(steps):
+    pages, current = [], []
+    for step in steps:
+        current.append(step)
+        advance = ends_page(step)
+        if advance:
+            pages.append((current, advance))
+            current = []
+    if current:
+        pages.append((current, None))
+    return pages
+
+
+def step_ops(step):
+    # yields (op, presence) with presence set for checks that only wait
+    builder = getattr(ops, step['action'], None)
+    if builder is None:
+        # helpers without an op form (e.g. expect_panda_table) run as-is
+        yield Op('call', step['action'], step_args(step)), False
+        return
+    for op in builder(**step_args(step)):
+        if op.kind == 'wait':
+            # optional label checks are covered by the required ones around them
+            continue
+        presence = op.kind == 'find' and (
+            step['action'] in PRESENCE_ONLY or op.message.startswith('Label '))
+        yield op, presence
+
+
+def page_ops(steps):
+    fills = []
+    for step in list(steps) + [None]:
+        if step is not None and step['action'].startswith('fill_'):
+            fills.append(step)
+            continue
+        if len(fills) > 1:
+            # adjacent fields are filled in a single round-trip
+            yield Op('batch', None, tuple(fills)), False
+        else:
+            for fill in fills:
+                yield from step_ops(fill)
+        fills = []
+        if step is not None:
+            yield from step_ops(step)
+
+
+def merge_checks(checks):
+    if len(checks) < 2:
+        return checks
+    # one wait for checks with no action between them instead of one each
+    conditions = ' and '.join('.' + op.selector for op in checks)
+    return [Op('find_all', f'/html/body[{conditions}]', tuple(checks), None,
+               ('all',) + tuple(op.locator for op in checks))]
+
+
+def compile_page(steps, advance):
+    # keeps the order of the steps: a text that appears only after a fill
+    # is still checked after that fill
+    compiled, checks = [], []
+    for op, presence in page_ops(steps):
+        if presence:
+            if all(op.selector != check.selector for check in checks):
+                checks.append(op)
+            continue
+        compiled += merge_checks(checks)
+        checks = []
+        compiled.append(op)
+    compiled += merge_checks(checks)
+    return Page(tuple(compiled), tuple(steps), advance)
+
+
+def compile_flow(spec):
+    pages = tuple(compile_page(steps, advance)
+                  for steps, advance in split_pages(spec['steps']))
+    return Plan(spec['name'], spec['form_id'], spec['title'], pages)
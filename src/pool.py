@@ -0,0 +1,142 @@
+import atexit
+import threading
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError
+import browser_profile
+import waits
+from cdp import cdp
+
+# a driver whose browser or chromedriver died fails with connection errors
+# from urllib3 rather than WebDriverException
+DRIVER_ERRORS = (WebDriverException, HTTPError, OSError)
+
+RESET_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+def create_driver(selenium_url=None, fast=False, example_domain=None):
+    options = webdriver.ChromeOptions()
+    if fast:
+        browser_profile.apply_options(options, example_domain)
+    if selenium_url:
+        options.add_argument("--no-sandbox")
+        driver = webdriver.Remote(
+            command_executor=selenium_url, options=options)
+    else:
+        driver = webdriver.Chrome(options=options)
+    if fast:
+        browser_profile.apply_blocking(driver, example_domain)
+    install_activity(driver)
+    return driver
+
+
+def install_activity(driver):
+    # track traffic from the very first request of every document, not just
+    # from the first in-page wait after a navigation
+    try:
+        cdp(driver, "Page.addScriptToEvaluateOnNewDocument",
+            {"source": waits.ACTIVITY_JS + "abstraActivity();"})
+    except DRIVER_ERRORS:
+        pass
+
+
+class DriverPool:
+
+    def __init__(self, selenium_url=None, fast=False, example_domain=None):
+        self.selenium_url = selenium_url
+        self.fast = fast
+        self.example_domain = example_domain
+        self.idle = []
+        self.drivers = []
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def acquire(self):
+        # the lock only guards the lists; health checks and quit() talk to
+        # the browser and would hold up every other worker
+        while True:
+            with self.lock:
+                driver = self.idle.pop() if self.idle else None
+            if driver is None:
+                break
+            if self.is_healthy(driver):
+                return driver
+            self._discard(driver)
+        driver = create_driver(
+            self.selenium_url, self.fast, self.example_domain)
+        with self.lock:
+            self.drivers.append(driver)
+        return driver
+
+    def release(self, driver):
+        try:
+            self.reset(driver)
+        except DRIVER_ERRORS:
+            self._discard(driver)
+            return
+        with self.lock:
+            self.idle.append(driver)
+
+    def recycle(self, driver):
+        self._discard(driver)
+
+    def reset(self, driver):
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            # cookies of every origin, and storage of the example domain
+            # and of every frame still open, not just the top document
+            cdp(driver, "Network.clearBrowserCookies")
+            for origin in self.origins(driver):
+                cdp(driver, "Storage.clearDataForOrigin",
+                    {"origin": origin, "storageTypes": "all"})
+        except WebDriverException:
+            # without CDP (e.g. a non-Chrome grid node) only the current
+            # origin can be reached
+            driver.execute_script(RESET_STORAGE_SCRIPT)
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def origins(self, driver):
+        frames = cdp(driver, "Page.getFrameTree")["frameTree"]
+        pending, origins = [frames], set()
+        while pending:
+            node = pending.pop()
+            origin = node["frame"].get("securityOrigin")
+            if origin and origin != "null" and origin.startswith("http"):
+                origins.add(origin)
+            pending.extend(node.get("childFrames", []))
+        if self.example_domain:
+            origins.add(self.example_domain.rstrip("/"))
+        return origins
+
+    def is_healthy(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return len(driver.window_handles) > 0
+        except DRIVER_ERRORS:
+            return False
+
+    def close(self):
+        with self.lock:
+            drivers, self.drivers, self.idle = self.drivers, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except DRIVER_ERRORS:
+                pass
+
+    def _discard(self, driver):
+        with self.lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        try:
+            driver.quit()
+        except DRIVER_ERRORS:
+            pass
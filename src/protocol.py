@@ -0,0 +1,279 @@
+import argparse
+import base64
+import mimetypes
+import os
+import sys
+import time
+from datetime import datetime
+import plan
+import standin
+import waits
+import ws
+
+# each form has its own socket, e.g. wss://host/socket/{form_id}
+RUNTIME_URL = os.getenv("ABSTRA_RUNTIME_URL")
+
+# Messages exchanged with a form program over the runtime socket, as sent
+# and read by the hackerforms library the forms run on.
+#
+#   client -> program
+#     {"type": "start", "params": {<url query params>}}
+#     {"type": "form", "payload": {"<widget key>": <answer>, ...}, "action": "Next"}
+#   program -> client
+#     {"type": "form", "widgets": [<widget>, ...], "actions": ["Next"],
+#      "endProgram": false, "columns": 1, "reactivePollingInterval": 0, "steps": null}
+#     {"type": "program:end", "exitCode": 0, "exception": null}
+#
+# Widgets carry their "type" ("text-input", "multiple-choice-input",
+# "text-output", "pandas-output", ...), inputs a "key" (the label unless
+# the form sets one) and a "label". The page renders each widget with the
+# DOM id type + position on the page ("number-input1"), which is what the
+# index argument of the helpers refers to. The title is not part of the
+# socket messages, it comes with the page.
+
+
+class ProtocolRunner:
+
+    def __init__(self, url=RUNTIME_URL, timeout=None):
+        self.url = url
+        self.timeout = timeout or waits.timeout()
+        self.socket = None
+        self.params = {}
+        self.form = None
+        self.answers = {}
+
+    def fail(self, message):
+        raise AssertionError(message)
+
+    def open(self, form_id=None, **params):
+        # the program only starts once the start screen is dismissed
+        self.close()
+        self.socket = ws.connect(self.url.format(form_id=form_id), self.timeout)
+        self.params = params
+        self.form = None
+        self.answers = {}
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def receive(self):
+        message = self.socket.recv_json()
+        while message.get('type') == 'user-event':
+            message = self.socket.recv_json()
+        if message.get('type') == 'program:end':
+            if message.get('exitCode') or message.get('exception'):
+                self.fail(f"Form program failed: {message.get('exception') or message.get('exitCode')}")
+            message = {'type': 'form', 'widgets': [], 'actions': [], 'endProgram': True}
+        self.form = message
+        self.answers = {}
+        return message
+
+    def widgets(self, type=None):
+        return [widget for widget in self.form.get('widgets', [])
+                if type is None or widget.get('type') == type]
+
+    def expect_label(self, label):
+        if not any(label in widget.get('label', '') for widget in self.widgets()):
+            self.fail(f'Label {label} not found')
+
+    def widget(self, label, type, index, message):
+        widgets = self.widgets()
+        position = int(index)
+        if position < len(widgets) and widgets[position].get('type') == type:
+            return widgets[position]
+        # pages that lost a widget since the test was written still answer by label
+        for widget in widgets:
+            if widget.get('type') == type and label in widget.get('label', ''):
+                return widget
+        self.fail(message)
+
+    def option(self, widget, value, message):
+        # options are plain strings or dicts with a label (cards: title) and a value
+        for option in widget.get('options', []):
+            if isinstance(option, str):
+                if value in option:
+                    return option
+            elif value in str(option.get('label', option.get('title', ''))):
+                return option.get('value', option)
+        self.fail(message)
+
+    def expect_text(self, content, next=True):
+        if not any(content in widget.get('text', '') for widget in self.widgets()):
+            self.fail(f'Text {content} not found')
+        if next:
+            self.next()
+
+    def expect_link(self, content, url, next=True):
+        if not any(url in widget.get('linkUrl', '') and content in widget.get('linkText', '')
+                   for widget in self.widgets('link-output')):
+            self.fail(f'Link {content} not found')
+        if next:
+            self.next()
+
+    def expect_file(self, content, downloadUrl, next=True):
+        if not any(downloadUrl in widget.get('fileUrl', '') and content in widget.get('downloadText', '')
+                   for widget in self.widgets('file-output')):
+            self.fail(f'File {content} not found')
+        if next:
+            self.next()
+
+    def expect_panda_table(self, columns, next=True):
+        tables = self.widgets('pandas-output')
+        if not tables:
+            self.fail('Table not found')
+        # DataFrame.to_json(orient="table"); the index travels as the primary key
+        schema = tables[0].get('table', {}).get('schema', {})
+        index = set(schema.get('primaryKey', []))
+        headers = [field['name'] for field in schema.get('fields', []) if field['name'] not in index]
+        for position, column in enumerate(columns):
+            if position >= len(headers) or column not in str(headers[position]):
+                self.fail(f'Column {column} not found')
+        if next:
+            self.next()
+
+    def answer(self, label, type, index, value, message, next):
+        self.expect_label(label)
+        widget = self.widget(label, type, index, message)
+        self.answers[widget['key']] = value
+        if next:
+            self.next()
+
+    def fill_text(self, label, value, next=True, placeholder="Your answer here", type="text-input", index="0"):
+        value = float(value) if type == 'number-input' else str(value)
+        self.answer(label, type, index, value, 'Text input not found', next)
+
+    def fill_textarea(self, label, value, next=True, placeholder="Your answer here", type="textarea-input", index="0"):
+        self.answer(label, type, index, str(value), 'TextArea input not found', next)
+
+    def fill_phone(self, label, value, next=True, placeholder="(000)000-0000", type="phone-input", index="0"):
+        digits = ''.join(c for c in str(value) if c.isdigit())
+        self.answer(label, type, index,
+                    {'raw': digits, 'masked': str(value), 'countryCode': None, 'nationalNumber': digits},
+                    'Phone input not found', next)
+
+    def fill_date(self, label, value, next=True, type="date-input", index="0"):
+        # the date picker takes MM/DD/YYYY and answers with an ISO date
+        try:
+            value = datetime.strptime(value, '%m/%d/%Y').date().isoformat()
+        except ValueError:
+            pass
+        self.answer(label, type, index, value, 'Date input not found', next)
+
+    def fill_option(self, label, value, next=True, buttonText="Next", type="multiple-choice-input", index="0"):
+        self.expect_label(label)
+        widget = self.widget(label, type, index, f'Option {value} not found')
+        choice = self.option(widget, value, f'Option {value} not found')
+        self.answers[widget['key']] = [choice] if widget.get('multiple') else choice
+        # without a next button the choice itself submits the step
+        if next or not buttonText:
+            self.next(buttonText or None)
+
+    def fill_multiple_options(self, label, values, next=True, type="multiple-choice-input", index="0"):
+        self.expect_label(label)
+        widget = self.widget(label, type, index, f'Option {values[0]} not found')
+        self.answers[widget['key']] = [
+            self.option(widget, value, f'Option {value} not found') for value in values]
+        if next:
+            self.next()
+
+    def fill_dropdown(self, label, value, next=True, type="dropdown-input", index="0"):
+        self.expect_label(label)
+        widget = self.widget(label, type, index, f'Dropdown Button {value} not found')
+        self.answers[widget['key']] = self.option(
+            widget, value, f'Dropdown Option {value} not found')
+        if next:
+            self.next()
+
+    def fill_card(self, label, value, next=True, type="cards-input", index="0"):
+        self.expect_label(label)
+        widget = self.widget(label, type, index, f'Card {value} not found')
+        card = self.option(widget, value, f'Card {value} not found')
+        self.answers[widget['key']] = [card] if widget.get('multiple') else card
+        if next:
+            self.next()
+
+    def fill_file(self, label, value, next=True, type='file-input', index="0"):
+        # the browser answers with the url of the uploaded file; without the
+        # upload service the content goes inline, which the library also reads
+        mime = mimetypes.guess_type(value)[0] or 'application/octet-stream'
+        with open(value, 'rb') as f:
+            content = base64.b64encode(f.read()).decode()
+        self.answer(label, type, index, f'data:{mime};base64,{content}',
+                    'File input not found', next)
+
+    def fill_many(self, fields, next=True):
+        for field in fields:
+            getattr(self, field['action'])(next=False, **plan.step_args(field))
+        if next:
+            self.next()
+
+    def next(self, action=None):
+        if self.form is None:
+            self.socket.send_json({'type': 'start', 'params': self.params})
+            self.receive()
+            return
+        if self.form.get('endProgram'):
+            self.fail('Form already finished')
+        actions = self.form.get('actions') or []
+        self.socket.send_json({'type': 'form', 'payload': self.answers,
+                               'action': action or (actions[0] if actions else None)})
+        self.receive()
+
+    def run_flow(self, name):
+        flow = plan.load(name)
+        self.open(flow.form_id)
+        self.next()
+        for page in flow.pages:
+            for step in page.steps:
+                getattr(self, step['action'])(next=False, **plan.step_args(step))
+            if page.advance == 'next':
+                self.next()
+
+
+def run_standin(runner, steps, fields, delay):
+    spec = standin.form_spec(steps, fields, delay)
+    runner.open(steps=steps, fields=fields, delay=delay)
+    runner.next()
+    for step in range(steps):
+        for helper, label, value, kwargs in standin.fields_for(spec, step):
+            getattr(runner, helper)(label, value, False, **kwargs)
+        runner.next()
+    runner.expect_text('All steps done', False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Replay flows against the form runtime without a browser.')
+    parser.add_argument('flows', nargs='*', help='flow names (default: all)')
+    parser.add_argument('--url', default=RUNTIME_URL, help='runtime socket url')
+    parser.add_argument('--standin', action='store_true',
+                        help='run a synthetic form against a local stand-in')
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--fields', type=int, default=3)
+    args = parser.parse_args()
+
+    failures = 0
+    if args.standin:
+        server, base_url = standin.serve()
+        runner = ProtocolRunner(base_url.replace('http', 'ws', 1) + '/_socket')
+        jobs = [('standin', lambda: run_standin(runner, args.steps, args.fields, 0))]
+    else:
+        if not args.url:
+            parser.error('--url or ABSTRA_RUNTIME_URL is required')
+        runner = ProtocolRunner(args.url)
+        jobs = [(name, lambda name=name: runner.run_flow(name))
+                for name in args.flows or plan.flow_names()]
+    for name, job in jobs:
+        start = time.perf_counter()
+        try:
+            job()
+            status = 'ok'
+        except (AssertionError, OSError, ws.ConnectionClosed) as error:
+            failures += 1
+            status = f'FAIL: {error}'
+        finally:
+            runner.close()
+        print(f'{name} ... {status} ({time.perf_counter() - start:.3f}s)')
+    sys.exit(1 if failures else 0)
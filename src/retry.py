@@ -0,0 +1,149 @@
+import atexit
+import functools
+import os
+import time
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+RETRIES = int(os.getenv("ABSTRA_RETRIES", "3"))
+BACKOFF = float(os.getenv("ABSTRA_RETRY_BACKOFF", "0.25"))
+MAX_RESUMES = int(os.getenv("ABSTRA_MAX_RESUMES", "1"))
+
+TRANSIENT = {
+    StaleElementReferenceException: 'stale element',
+    ElementClickInterceptedException: 'click intercepted',
+    ElementNotInteractableException: 'not interactable',
+    TimeoutException: 'slow render',
+}
+
+# a timeout already waited its full length, so slow renders get one more try
+LIMITS = {'slow render': 1}
+
+STATS = {}
+
+
+def classify(error):
+    for kind, name in TRANSIENT.items():
+        if isinstance(error, kind):
+            return name
+    # helpers raise TimeoutException only when the step never settled; a
+    # plain AssertionError is a settled page without what the test expects
+    return None
+
+
+class TestStats:
+
+    def __init__(self, test_id, started):
+        self.test_id = test_id
+        self.started = started
+        self.retries = {}
+        self.retry_seconds = 0.0
+        self.resumes = 0
+        self.resume_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def recovered(self, failed_at, cost):
+        # a full rerun would have to repeat everything up to the failure
+        self.saved_seconds += max(0.0, (failed_at - self.started) - cost)
+
+
+def stats_for(case):
+    stats = STATS.get(case.id())
+    if stats is None:
+        stats = STATS[case.id()] = TestStats(case.id(), case.started)
+    return stats
+
+
+def with_retries(case, action):
+    delay = BACKOFF
+    failed_at = None
+    attempts = {}
+    while True:
+        try:
+            result = action()
+        except (AssertionError, WebDriverException) as error:
+            kind = classify(error)
+            if kind is None or attempts.get(kind, 0) >= LIMITS.get(kind, RETRIES):
+                raise
+            attempts[kind] = attempts.get(kind, 0) + 1
+            stats = stats_for(case)
+            stats.retries[kind] = stats.retries.get(kind, 0) + 1
+            failed_at = failed_at or time.perf_counter()
+            time.sleep(delay)
+            delay *= 2
+            continue
+        if failed_at is not None:
+            stats = stats_for(case)
+            cost = time.perf_counter() - failed_at
+            stats.retry_seconds += cost
+            stats.recovered(failed_at, cost)
+        return result
+
+
+def checkpointed(method):
+    # Journals top-level helper calls. When one fails for good on something
+    # transient, the form is reopened, the journal since the last driver.get
+    # is replayed and the call is tried once more.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.checkpoint_depth or self.replaying:
+            return method(self, *args, **kwargs)
+        url = self.tracer.last_url
+        self.checkpoint_depth += 1
+        try:
+            result = method(self, *args, **kwargs)
+        except (AssertionError, WebDriverException) as error:
+            self.checkpoint_depth -= 1
+            if not url or self.resumes >= MAX_RESUMES or classify(error) is None:
+                raise
+            result = resume(self, url, method, args, kwargs)
+        else:
+            self.checkpoint_depth -= 1
+        self.journal.append((url, method, args, kwargs))
+        return result
+    return wrapper
+
+
+def resume(case, url, method, args, kwargs):
+    failed_at = time.perf_counter()
+    case.resumes += 1
+    case.replaying = True
+    try:
+        case.index.invalidate(new_step=True)
+        case.driver.get(url)
+        for entry_url, entry, entry_args, entry_kwargs in case.journal:
+            if entry_url == url:
+                entry(case, *entry_args, **entry_kwargs)
+        result = method(case, *args, **kwargs)
+    finally:
+        case.replaying = False
+    stats = stats_for(case)
+    cost = time.perf_counter() - failed_at
+    stats.resumes += 1
+    stats.resume_seconds += cost
+    stats.recovered(failed_at, cost)
+    return result
+
+
+def summary():
+    lines = [f"{'retries':>7} {'resumes':>7} {'spent':>8} {'saved':>8}  test"]
+    for stats in STATS.values():
+        lines.append(
+            f"{sum(stats.retries.values()):7d} {stats.resumes:7d} "
+            f"{stats.retry_seconds + stats.resume_seconds:8.2f} {stats.saved_seconds:8.2f}  "
+            f"{stats.test_id.rsplit('.', 1)[-1]} "
+            + ', '.join(f'{kind} x{count}' for kind, count in stats.retries.items()))
+    return '\n'.join(lines)
+
+
+def print_summary():
+    if STATS:
+        print(f"\nRecovered steps:\n{summary()}")
+
+
+atexit.register(print_summary)
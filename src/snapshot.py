@@ -0,0 +1,117 @@
+# Captures everything the helpers look for on the current step in one
+# script call. Selectors use substring attribute matches so they agree
+# with the contains(@class, ...) / contains(@id, ...) XPaths in ops.py.
+SNAPSHOT_SCRIPT = """
+const all = (root, selector) => Array.from(root.querySelectorAll(selector));
+const text = (elem) => elem.textContent;
+return {
+  labels: all(document, 'div[class*="label"]').map(text),
+  texts: all(document, 'div[class*="text"]').map(text),
+  links: all(document, 'a[href]').map((a) => [a.getAttribute('href'), text(a)]),
+  buttons: all(document, 'div[class*="multiple-choice-button"]').map((b) => [text(b), b]),
+  dropdown_options: all(document, 'li[class*="vs__dropdown-option"]').map((li) => [text(li), li]),
+  headers: all(document, 'table thead tr th').map(text),
+  widgets: all(document, 'div[id*="-input"]').map((widget) => ({
+    id: widget.id,
+    inputs: all(widget, 'input[class*="input"], textarea[class*="input"]').map((input) => [
+      input.tagName.toLowerCase(),
+      input.getAttribute('placeholder') || '',
+      input.getAttribute('type') || '',
+      input,
+    ]),
+    choices: all(widget, 'div[class*="radiobox"], div[class*="checkbox"]').map((choice) => [
+      (choice.getAttribute('class') || '').includes('radiobox') ? 'radiobox' : 'checkbox',
+      text(choice),
+      choice,
+    ]),
+    cards: all(widget, 'h3[class*="card-title"]').map((card) => [text(card), card]),
+    dropdown: widget.querySelector('div[class*="v-select"]'),
+    filename: widget.querySelector('div[class*="filename"]') !== null,
+  })),
+};
+"""
+
+
+class StepIndex:
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.data = None
+        self.awaiting_render = False
+
+    def invalidate(self, new_step=False):
+        self.data = None
+        # right after next() the old step may still be on screen, so the
+        # first lookup goes through a real wait before snapshotting again
+        self.awaiting_render = new_step
+
+    def take(self):
+        self.data = self.driver.execute_script(SNAPSHOT_SCRIPT)
+        self.awaiting_render = False
+        return self.data
+
+    def resolve(self, locator):
+        if locator is None or self.awaiting_render:
+            return None
+        if self.data is None:
+            self.take()
+        kind, *args = locator
+        return getattr(self, f"find_{kind.replace('-', '_')}")(*args)
+
+    def widgets(self, key):
+        return [widget for widget in self.data['widgets'] if key in widget['id']]
+
+    def find_label(self, label):
+        return any(label in text for text in self.data['labels'])
+
+    def find_text(self, content):
+        return any(content in text for text in self.data['texts'])
+
+    def find_link(self, content, url):
+        return any(url in href and content in text for href, text in self.data['links'])
+
+    def find_all(self, *locators):
+        return all(self.resolve(locator) for locator in locators)
+
+    def find_input(self, key, tag, attribute, needle):
+        for widget in self.widgets(key):
+            for input_tag, placeholder, type, elem in widget['inputs']:
+                value = placeholder if attribute == 'placeholder' else type
+                if input_tag == tag and needle in value:
+                    return elem
+        return None
+
+    def find_choice(self, key, kind, value):
+        for widget in self.widgets(key):
+            for choice_kind, text, elem in widget['choices']:
+                if choice_kind == kind and value in text:
+                    return elem
+        return None
+
+    def find_card(self, key, value):
+        for widget in self.widgets(key):
+            for text, elem in widget['cards']:
+                if value in text:
+                    return elem
+        return None
+
+    def find_dropdown(self, key):
+        for widget in self.widgets(key):
+            if widget['dropdown']:
+                return widget['dropdown']
+        return None
+
+    def find_dropdown_option(self, value):
+        for text, elem in self.data['dropdown_options']:
+            if value in text:
+                return elem
+        return None
+
+    def find_button(self, value):
+        for text, elem in self.data['buttons']:
+            if value in text:
+                return elem
+        return None
+
+    def find_filename(self, key):
+        return any(widget['filename'] for widget in self.widgets(key))
@@ -0,0 +1,295 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+import ws
+
+# Widget kinds rendered by the stand-in, in the order fields cycle through
+# them. Each maps to the helper that fills it and the value it uses.
+KINDS = [
+    ('text-input', 'fill_text', 'Abstra Bot'),
+    ('textarea-input', 'fill_textarea', 'Lorem ipsum dolor sit amet'),
+    ('phone-input', 'fill_phone', '11999999999'),
+    ('date-input', 'fill_date', '2022-01-03'),
+    ('multiple-choice-input', 'fill_option', 'Option B'),
+    ('checkbox-input', 'fill_multiple_options', ['Option A', 'Option C']),
+    ('dropdown-input', 'fill_dropdown', 'Option B'),
+    ('cards-input', 'fill_card', 'Option B'),
+]
+OPTIONS = ['Option A', 'Option B', 'Option C']
+CHOICE_KINDS = {'multiple-choice-input', 'checkbox-input', 'dropdown-input', 'cards-input'}
+
+
+def form_spec(steps=5, fields=3, delay=0, kinds=None, title='Synthetic form'):
+    kinds = kinds or [kind for kind, _, _ in KINDS]
+    return {
+        'title': title,
+        'delay': delay,
+        'steps': [
+            {'text': f'Step {step}', 'fields': [
+                {'kind': kinds[(step * fields + field) % len(kinds)],
+                 'label': f'Step {step} field {field}',
+                 # the step text is the first widget on the page
+                 'index': str(field + 1)}
+                for field in range(fields)]}
+            for step in range(steps)],
+    }
+
+
+def fields_for(spec, step):
+    by_kind = {kind: (helper, value) for kind, helper, value in KINDS}
+    for field in spec['steps'][step]['fields']:
+        helper, value = by_kind[field['kind']]
+        kwargs = {'index': field['index']}
+        if field['kind'] == 'checkbox-input':
+            kwargs['type'] = 'checkbox-input'
+        yield helper, field['label'], value, kwargs
+
+
+def form_message(spec, step):
+    # shaped like the messages of the form library, see protocol.py
+    if step == len(spec['steps']):
+        return {'type': 'form', 'widgets': [{'type': 'text-output', 'text': 'Thanks! All steps done.'}],
+                'actions': [], 'endProgram': True, 'columns': 1,
+                'reactivePollingInterval': 0, 'steps': None}
+    page = spec['steps'][step]
+    widgets = [{'type': 'text-output', 'text': page['text']}]
+    for field in page['fields']:
+        widget = {'type': field['kind'], 'key': field['label'], 'label': field['label'],
+                  'required': True}
+        if field['kind'] in CHOICE_KINDS:
+            widget['options'] = OPTIONS
+            widget['multiple'] = field['kind'] == 'checkbox-input'
+        widgets.append(widget)
+    return {'type': 'form', 'widgets': widgets, 'actions': ['Next'], 'endProgram': False,
+            'columns': 1, 'reactivePollingInterval': 0, 'steps': None}
+
+
+def serve_socket(socket):
+    # like the library, wait for start and take the url params from it
+    message = {}
+    while message.get('type') != 'start':
+        message = socket.recv_json()
+    spec = spec_from_query(urlencode(message.get('params') or {}))
+    for step in range(len(spec['steps']) + 1):
+        time.sleep(spec['delay'] / 1000 if step else 0)
+        form = form_message(spec, step)
+        socket.send_json(form)
+        if form['endProgram']:
+            break
+        expected = {widget['key'] for widget in form['widgets'] if 'key' in widget}
+        message = socket.recv_json()
+        while message.get('type') == 'user-event':
+            socket.send_json({'type': 'user-event', 'widgets': form['widgets'],
+                              'validation': {'status': True, 'message': ''}})
+            message = socket.recv_json()
+        missing = expected - set(message.get('payload') or {})
+        if missing:
+            socket.send_json({'type': 'program:end', 'exitCode': 1,
+                              'exception': f'Missing answers: {sorted(missing)}'})
+            return
+    socket.send_json({'type': 'program:end', 'exitCode': 0, 'exception': None})
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  .hidden { display: none; }
+  .card-title, .radiobox, .checkbox, .vs__dropdown-option { cursor: pointer; }
+</style>
+</head>
+<body>
+<div id="app"></div>
+<script>
+const SPEC = __SPEC__;
+const OPTIONS = __OPTIONS__;
+const app = document.getElementById('app');
+
+function el(tag, attrs, children) {
+  const node = document.createElement(tag);
+  Object.entries(attrs || {}).forEach(([k, v]) => {
+    if (k === 'text') node.textContent = v; else node.setAttribute(k, v);
+  });
+  (children || []).forEach((child) => node.appendChild(child));
+  return node;
+}
+
+function input(kind) {
+  if (kind === 'textarea-input') {
+    return el('textarea', {class: 'input', placeholder: 'Your answer here'});
+  }
+  if (kind === 'phone-input') {
+    return el('input', {class: 'input', type: 'tel', placeholder: '(000)000-0000'});
+  }
+  if (kind === 'date-input') return el('input', {class: 'input', type: 'date'});
+  if (kind === 'file-input') {
+    const file = el('input', {class: 'input', type: 'file'});
+    file.addEventListener('change', () => {
+      const name = file.files.length ? file.files[0].name : '';
+      upload(file.files[0]).then((response) => {
+        if (response && !response.ok) return;
+        file.parentNode.appendChild(el('div', {class: 'filename', text: name}));
+      });
+    });
+    return file;
+  }
+  if (kind === 'multiple-choice-input' || kind === 'checkbox-input') {
+    const cls = kind === 'checkbox-input' ? 'checkbox' : 'radiobox';
+    return el('div', {}, OPTIONS.map((option) => {
+      const box = el('div', {class: cls, text: option});
+      box.addEventListener('click', () => box.classList.toggle('selected'));
+      return box;
+    }));
+  }
+  if (kind === 'dropdown-input') {
+    const select = el('div', {class: 'v-select vs--single'});
+    const toggle = el('div', {class: 'vs__dropdown-toggle', text: 'Select'});
+    select.appendChild(toggle);
+    // vue-select opens on a mousedown on the toggle, not on the root
+    toggle.addEventListener('mousedown', () => {
+      if (select.querySelector('ul')) return;
+      const list = el('ul', {class: 'vs__dropdown-menu'}, OPTIONS.map((option) => {
+        const item = el('li', {class: 'vs__dropdown-option', text: option});
+        item.addEventListener('click', (event) => {
+          event.stopPropagation();
+          toggle.textContent = option;
+          list.remove();
+        });
+        return item;
+      }));
+      select.appendChild(list);
+    });
+    return select;
+  }
+  if (kind === 'cards-input') {
+    return el('div', {}, OPTIONS.map((option) => {
+      const card = el('div', {class: 'card'}, [el('h3', {class: 'card-title', text: option})]);
+      card.addEventListener('click', () => card.classList.toggle('selected'));
+      return card;
+    }));
+  }
+  return el('input', {class: 'input', type: 'text', placeholder: 'Your answer here'});
+}
+
+function upload(file) {
+  if (!file) return Promise.resolve();
+  return fetch('/upload' + location.search, {method: 'POST', body: file, headers: {'X-Filename': file.name}});
+}
+
+function render(step) {
+  app.innerHTML = '';
+  if (step === SPEC.steps.length) {
+    app.appendChild(el('div', {class: 'text', text: 'Thanks! All steps done.'}));
+    return;
+  }
+  const page = step < 0
+    ? {text: SPEC.title, fields: []}
+    : SPEC.steps[step];
+  const form = el('div', {class: 'form'});
+  form.appendChild(el('div', {class: 'text', text: page.text}));
+  page.fields.forEach((field) => {
+    form.appendChild(el('div', {id: field.kind + field.index, class: 'widget'}, [
+      el('div', {class: 'label', text: field.label}),
+      input(field.kind),
+    ]));
+  });
+  const next = el('button', {class: 'next-button', text: 'Next'});
+  next.addEventListener('click', () => {
+    app.innerHTML = '';
+    setTimeout(() => render(step + 1), SPEC.delay);
+  });
+  form.appendChild(next);
+  app.appendChild(form);
+}
+
+render(-1);
+</script>
+</body>
+</html>
+"""
+
+
+def render_page(spec):
+    return (PAGE
+            .replace('__TITLE__', spec['title'])
+            .replace('__SPEC__', json.dumps(spec))
+            .replace('__OPTIONS__', json.dumps(OPTIONS)))
+
+
+def spec_from_query(query):
+    params = parse_qs(query)
+
+    def number(name, default):
+        return int(params.get(name, [default])[0])
+
+    kinds = params.get('kinds', [None])[0]
+    return form_spec(
+        steps=number('steps', 5),
+        fields=number('fields', 3),
+        delay=number('delay', 0),
+        kinds=kinds.split(',') if kinds else None,
+        title=params.get('title', ['Synthetic form'])[0])
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/favicon.ico':
+            self.send_error(404)
+            return
+        if url.path == '/_socket':
+            try:
+                serve_socket(ws.accept(self))
+            except (ws.ConnectionClosed, OSError):
+                pass
+            return
+        self.respond(200, 'text/html; charset=utf-8',
+                     render_page(spec_from_query(url.query)).encode())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/upload':
+            self.send_error(404)
+            return
+        remaining = int(self.headers.get('Content-Length', 0))
+        limit = parse_qs(url.query).get('upload_limit')
+        if limit and remaining > int(limit[0]):
+            self.send_error(413)
+            return
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 16)))
+        self.respond(200, 'application/json', b'{"ok": true}')
+
+    def respond(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host='127.0.0.1', port=0):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f'Serving synthetic forms on http://{args.host}:{args.port}/?steps=5&fields=3&delay=0')
+    server.serve_forever()
@@ -0,0 +1,161 @@
+import csv
+import json
+import math
+import os
+from collections import namedtuple
+from itertools import chain, zip_longest
+from selenium.common.exceptions import TimeoutException
+import plan
+import waits
+
+MAX_PAGES = int(os.getenv("ABSTRA_TABLE_MAX_PAGES", "1000"))
+PAGE_SETTLE_MS = 200
+# how many mismatches are listed before the rest are only counted
+REPORT_LIMIT = 20
+
+Table = namedtuple('Table', 'columns index rows')
+MISSING = object()
+
+# Reads the first table on the step in one call: header texts, index
+# labels and the data cells of every body row. When a pager selector is
+# given and it is enabled, the script clicks it and only returns once the
+# next page rendered, so each page costs a single round trip.
+TABLE_SCRIPT = waits.ACTIVITY_JS + """
+const [pager, timeout, settle, done] = arguments;
+const activity = abstraActivity();
+const texts = (cells) => Array.from(cells, (cell) => cell.textContent.trim());
+
+function read() {
+  const table = document.querySelector('table');
+  if (!table) return null;
+  // the first header row has the column names; pandas adds a second one
+  // with the index names when the index is named
+  const head = table.tHead ? table.tHead.rows : [];
+  const columns = head.length ? texts(head[0].cells) : [];
+  const index = [];
+  const rows = [];
+  let labelCount = null;
+  for (const body of table.tBodies) {
+    for (const row of body.rows) {
+      const labels = row.querySelectorAll(':scope > th');
+      if (labelCount === null) labelCount = labels.length;
+      if (labels.length) index.push(texts(labels).join(' '));
+      rows.push(texts(row.querySelectorAll(':scope > td')));
+    }
+  }
+  // index columns are th cells in the body; with no rows, the blank
+  // corner cells above them in the header
+  if (labelCount === null) {
+    labelCount = 0;
+    while (labelCount < columns.length && !columns[labelCount]) labelCount++;
+  }
+  columns.splice(0, labelCount);
+  return {columns, index, rows};
+}
+
+function signature() {
+  const table = document.querySelector('table');
+  const body = table && table.tBodies[0];
+  return body ? body.rows.length + ':' + (body.rows[0] ? body.rows[0].textContent : '') : '';
+}
+
+const page = read();
+const button = page && pager ? document.querySelector(pager) : null;
+if (!button || button.disabled || button.getAttribute('aria-disabled') === 'true') {
+  done(page && Object.assign(page, {more: false}));
+  return;
+}
+const before = signature();
+const deadline = performance.now() + timeout;
+button.click();
+(function poll() {
+  if (signature() !== before && activity.settled(settle)) {
+    done(Object.assign(page, {more: true}));
+  } else if (performance.now() > deadline) {
+    done(Object.assign(page, {more: false, error: 'Next table page did not render'}));
+  } else {
+    setTimeout(poll, 50);
+  }
+})();
+"""
+
+
+def pages(driver, pager=None, timeout=None, max_pages=MAX_PAGES):
+    timeout = timeout or waits.timeout('expect_panda_table')
+    for _ in range(max_pages):
+        page = driver.execute_async_script(
+            TABLE_SCRIPT, pager, int(timeout * 1000), PAGE_SETTLE_MS)
+        if page is None:
+            raise AssertionError('Table not found')
+        yield Table(page['columns'], page['index'], page['rows'])
+        if page.get('error'):
+            raise TimeoutException(page['error'])
+        if not page['more']:
+            return
+
+
+def number(text):
+    cleaned = text.replace(',', '').replace('$', '').replace('%', '').strip()
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def matches(text, expected, tolerance):
+    # None in a fixture matches anything, numbers compare within tolerance
+    if expected is None:
+        return True
+    if isinstance(expected, bool):
+        return text.strip().lower() == str(expected).lower()
+    if isinstance(expected, (int, float)):
+        value = number(text)
+        return value is not None and math.isclose(value, expected, rel_tol=0, abs_tol=tolerance)
+    return text.strip() == str(expected)
+
+
+def expected_rows(rows):
+    # rows inline, or a .json / .csv fixture next to the flows
+    if not isinstance(rows, str):
+        return rows
+    path = rows if os.path.isabs(rows) else os.path.join(plan.FLOWS_DIR, rows)
+    with open(path, newline='') as f:
+        if not path.endswith('.csv'):
+            return json.load(f)
+        reader = csv.reader(f)
+        next(reader, None)
+        return [[cell if number(cell) is None else number(cell) for cell in row]
+                for row in reader]
+
+
+def verify(driver, columns, rows=None, tolerance=1e-6, pager=None, timeout=None):
+    # headers alone are on the first page, so the pager is left alone
+    stream = pages(driver, pager if rows is not None else None, timeout)
+    first = next(stream)
+    problems = [f'Column {column} not found' for index, column in enumerate(columns)
+                if index >= len(first.columns) or column not in first.columns[index]]
+    if rows is None:
+        return problems
+
+    if not isinstance(tolerance, dict):
+        tolerance = {column: tolerance for column in first.columns}
+    limits = [tolerance.get(column, 0.0) for column in first.columns]
+    actual = chain(first.rows, chain.from_iterable(page.rows for page in stream))
+    count = 0
+    for count, (row, want) in enumerate(
+            zip_longest(actual, expected_rows(rows), fillvalue=MISSING), 1):
+        if row is MISSING:
+            problems.append(f'Row {count} missing, expected {want}')
+        elif want is MISSING:
+            problems.append(f'Unexpected row {count}: {row}')
+        elif len(row) != len(want):
+            problems.append(f'Row {count} has {len(row)} cells, expected {len(want)}')
+        else:
+            for column, (text, value) in enumerate(zip(row, want)):
+                limit = limits[column] if column < len(limits) else 0.0
+                if not matches(text, value, limit):
+                    name = first.columns[column] if column < len(first.columns) else column
+                    problems.append(f'Row {count} {name}: {text!r} != {value!r}')
+    if len(problems) > REPORT_LIMIT:
+        problems[REPORT_LIMIT:] = [f'... and {len(problems) - REPORT_LIMIT} more of {count} rows']
+    return problems
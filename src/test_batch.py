@@ -0,0 +1,29 @@
+import unittest
+import batch
+
+
+class TestSplit(unittest.TestCase):
+
+    def test_runs_keep_page_order(self):
+        runs = batch.split([
+            {'action': 'fill_text', 'label': 'Name', 'value': 'a'},
+            {'action': 'fill_phone', 'label': 'Phone', 'value': '11999999999'},
+            {'action': 'fill_dropdown', 'label': 'Country', 'value': 'Brazil'},
+            {'action': 'fill_text', 'label': 'City', 'value': 'b'},
+        ])
+        self.assertEqual([native for native, _ in runs], [False, True, False])
+        self.assertEqual([name for name, _ in runs[0][1]], ['Name'])
+        self.assertEqual([op.kind for op in runs[1][1]], ['find', 'type'])
+        self.assertEqual([name for name, _ in runs[2][1]], ['Country', 'City'])
+
+    def test_dropdown_opens_then_picks(self):
+        (native, fields), = batch.split(
+            [{'action': 'fill_dropdown', 'label': 'Country', 'value': 'Brazil'}])
+        self.assertFalse(native)
+        _, steps = fields[0]
+        self.assertEqual([step['kind'] for step in steps], ['find', 'click', 'click'])
+        self.assertIn('v-select', steps[1]['selector'])
+
+
+if __name__ == '__main__':
+    unittest.main()
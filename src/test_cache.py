@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import cache
+
+
+class Example:
+    # stands in for a TestExamples test, without being collected itself
+
+    def __init__(self, name):
+        self._testMethodName = name
+
+    def id(self):
+        return f'test_cache.Example.{self._testMethodName}'
+
+    def test_form(self):
+        self.driver.get("https://examples.abstra.run/2ef3700b-9d75-49bb-9c60-7924a0cb8c19")
+
+    def test_no_form(self):
+        pass
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'results.json')
+
+    def test_round_trip(self):
+        results = cache.ResultCache(self.path, ttl=60)
+        results.store('key', 'test')
+        results.save()
+        self.assertTrue(cache.ResultCache(self.path, ttl=60).passed('key'))
+        self.assertFalse(cache.ResultCache(self.path, ttl=60).passed('other'))
+
+    def test_evict_drops_expired_then_oldest(self):
+        results = cache.ResultCache(self.path, ttl=60, max_entries=2)
+        with mock.patch('time.time', return_value=1000.0):
+            results.entries = {
+                'expired': {'test': 'a', 'passed_at': 900.0},
+                'old': {'test': 'b', 'passed_at': 970.0},
+                'newer': {'test': 'c', 'passed_at': 980.0},
+                'newest': {'test': 'd', 'passed_at': 990.0},
+            }
+            results.evict()
+        self.assertEqual(set(results.entries), {'newer', 'newest'})
+
+
+class TestSelectChanged(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.results = cache.ResultCache(os.path.join(directory.name, 'results.json'), ttl=60)
+        self.tests = [Example('test_form'), Example('test_no_form')]
+
+    @mock.patch('cache.fingerprint', return_value='page-v1')
+    def test_only_passing_tests_are_skipped_next_time(self, fingerprint):
+        changed, unchanged, keys = cache.select_changed(self.tests, self.results)
+        self.assertEqual((changed, unchanged), (self.tests, []))
+        fingerprint.assert_called_once_with('2ef3700b-9d75-49bb-9c60-7924a0cb8c19')
+
+        result = unittest.TestResult()
+        result.failures.append((self.tests[1], 'boom'))
+        cache.record(result, changed, keys, self.results)
+        changed, unchanged, _ = cache.select_changed(self.tests, self.results)
+        self.assertEqual((changed, unchanged), ([self.tests[1]], [self.tests[0]]))
+
+        fingerprint.return_value = 'page-v2'
+        changed, unchanged, _ = cache.select_changed(self.tests, self.results)
+        self.assertEqual(unchanged, [])
+
+    @mock.patch('protocol.RUNTIME_URL', None)
+    def test_missing_runtime_url_fails_loudly(self):
+        cache.fingerprint.cache_clear()
+        with self.assertRaises(cache.FingerprintError):
+            cache.select_changed(self.tests, self.results)
+
+
+if __name__ == '__main__':
+    unittest.main()
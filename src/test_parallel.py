@@ -0,0 +1,78 @@
+import io
+import os
+import tempfile
+import unittest
+import parallel
+
+
+def examples(*names):
+    # defined here so the loader does not collect the failing example
+    class Example(unittest.TestCase):
+
+        def test_pass(self):
+            pass
+
+        def test_fail(self):
+            self.fail('boom')
+
+        @unittest.skip('not today')
+        def test_skip(self):
+            pass
+
+    return [Example(name) for name in names]
+
+
+class Named:
+
+    def __init__(self, name):
+        self.name = name
+
+    def id(self):
+        return self.name
+
+
+class TestShard(unittest.TestCase):
+
+    def test_longest_first_onto_the_lightest_worker(self):
+        tests = [Named(name) for name in 'abcde']
+        durations = {'a': 10, 'b': 7, 'c': 6, 'd': 5, 'e': 2}
+        shards = parallel.shard(tests, 2, durations)
+        self.assertEqual([[t.id() for t in s] for s in shards], [['a', 'd'], ['b', 'c', 'e']])
+
+    def test_unknown_tests_weigh_the_average(self):
+        tests = [Named('new'), Named('a'), Named('b')]
+        shards = parallel.shard(tests, 2, {'a': 10, 'b': 2})
+        self.assertEqual([[t.id() for t in s] for s in shards], [['a'], ['new', 'b']])
+
+    def test_no_empty_shards(self):
+        self.assertEqual(len(parallel.shard([Named('a')], 4, {})), 1)
+
+
+class TestResults(unittest.TestCase):
+
+    def test_shards_merge_into_one_result(self):
+        passing, failing, skipped = examples('test_pass', 'test_fail', 'test_skip')
+        first = parallel.run_shard([passing, failing])
+        second = parallel.run_shard([skipped])
+        self.assertEqual(set(first.durations), {passing.id(), failing.id()})
+
+        stream = io.StringIO()
+        merged = parallel.merge([first, second], stream, 1)
+        self.assertEqual(merged.testsRun, 3)
+        self.assertEqual(len(merged.failures), 1)
+        self.assertEqual(len(merged.skipped), 1)
+        self.assertFalse(merged.wasSuccessful())
+        merged.printErrors()
+        self.assertIn('boom', stream.getvalue())
+
+    def test_durations_round_trip(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'durations.json')
+        self.assertEqual(parallel.load_durations(path), {})
+        parallel.save_durations({'a': 1.5}, path)
+        self.assertEqual(parallel.load_durations(path), {'a': 1.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import plan
+
+
+def flow(*steps):
+    return {'name': 'example', 'form_id': 'form', 'title': 'Example', 'steps': list(steps)}
+
+
+def kinds(page):
+    return [op.kind for op in page.ops]
+
+
+class TestCompileFlow(unittest.TestCase):
+
+    def test_checks_stay_after_the_fills_they_depend_on(self):
+        compiled = plan.compile_flow(flow(
+            {'action': 'fill_text', 'label': 'Amount', 'value': '10', 'next': False},
+            {'action': 'expect_text', 'content': 'Total: 10', 'next': False},
+            {'action': 'fill_text', 'label': 'Other', 'value': '1', 'next': False},
+            {'action': 'expect_text', 'content': 'Total: 11'},
+        ))
+        page, = compiled.pages
+        self.assertEqual(kinds(page), ['find', 'type', 'find_all', 'type', 'find'])
+        self.assertIn('Total: 10', page.ops[2].selector)
+        self.assertIn('Other', page.ops[2].selector)
+        self.assertIn('Total: 11', page.ops[4].selector)
+        self.assertEqual(page.advance, 'next')
+
+    def test_adjacent_fills_are_batched_in_place(self):
+        compiled = plan.compile_flow(flow(
+            {'action': 'expect_text', 'content': 'Welcome', 'next': False},
+            {'action': 'fill_text', 'label': 'First', 'value': 'a', 'next': False},
+            {'action': 'fill_text', 'label': 'Last', 'value': 'b', 'next': False},
+            {'action': 'expect_text', 'content': 'Hello a b', 'next': False},
+            {'action': 'fill_text', 'label': 'Email', 'value': 'c'},
+        ))
+        page, = compiled.pages
+        self.assertEqual(kinds(page), ['find', 'batch', 'find_all', 'type'])
+        self.assertEqual([step['label'] for step in page.ops[1].value], ['First', 'Last'])
+        self.assertIn('Hello a b', page.ops[2].selector)
+        self.assertIn('Email', page.ops[2].selector)
+
+    def test_adjacent_checks_are_merged_once(self):
+        compiled = plan.compile_flow(flow(
+            {'action': 'expect_text', 'content': 'One', 'next': False},
+            {'action': 'expect_text', 'content': 'Two', 'next': False},
+            {'action': 'expect_text', 'content': 'One'},
+        ))
+        page, = compiled.pages
+        self.assertEqual(kinds(page), ['find_all'])
+        self.assertEqual(len(page.ops[0].value), 2)
+
+    def test_pages_split_on_next_and_auto_advance(self):
+        compiled = plan.compile_flow(flow(
+            {'action': 'expect_text', 'content': 'Intro'},
+            {'action': 'fill_option', 'label': 'Pick', 'value': 'A', 'buttonText': None},
+            {'action': 'expect_panda_table', 'columns': ['Name'], 'next': False},
+        ))
+        self.assertEqual([page.advance for page in compiled.pages], ['next', 'auto', None])
+        self.assertEqual(kinds(compiled.pages[2]), ['call'])
+        self.assertEqual(compiled.pages[2].ops[0].value, {'columns': ['Name']})
+
+    def test_shipped_flows_compile(self):
+        for name in plan.flow_names():
+            compiled = plan.load(name)
+            self.assertTrue(compiled.pages, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
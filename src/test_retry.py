@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+import retry
+from retry import checkpointed
+
+
+class Case:
+
+    def __init__(self):
+        self.started = 0.0
+        self.journal = []
+        self.checkpoint_depth = 0
+        self.replaying = False
+        self.resumes = 0
+        self.tracer = mock.Mock(last_url='https://example/form')
+        self.index = mock.Mock()
+        self.driver = mock.Mock()
+        self.calls = []
+        self.failures = []
+
+    def id(self):
+        return 'test_retry.Case.example'
+
+    @checkpointed
+    def step(self, name):
+        self.calls.append(name)
+        if self.failures:
+            raise self.failures.pop(0)
+
+
+class TestClassify(unittest.TestCase):
+
+    def test_timeouts_are_slow_renders(self):
+        self.assertEqual(retry.classify(TimeoutException('Text Total not found')), 'slow render')
+        self.assertEqual(retry.classify(StaleElementReferenceException()), 'stale element')
+
+    def test_settled_misses_are_not_transient(self):
+        self.assertIsNone(retry.classify(AssertionError('Text Total: 10 not found')))
+        self.assertIsNone(retry.classify(AssertionError('Column Amount not found')))
+
+
+@mock.patch('time.sleep', lambda seconds: None)
+class TestWithRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.case = Case()
+        self.addCleanup(retry.STATS.pop, self.case.id(), None)
+
+    def test_slow_render_gets_one_more_try(self):
+        action = mock.Mock(side_effect=[TimeoutException('late'), 'done'])
+        self.assertEqual(retry.with_retries(self.case, action), 'done')
+        self.assertEqual(retry.STATS[self.case.id()].retries, {'slow render': 1})
+
+        action = mock.Mock(side_effect=TimeoutException('late'))
+        with self.assertRaises(TimeoutException):
+            retry.with_retries(self.case, action)
+        self.assertEqual(action.call_count, 2)
+
+    def test_assertion_fails_at_once(self):
+        action = mock.Mock(side_effect=AssertionError('Text Total: 10 not found'))
+        with self.assertRaises(AssertionError):
+            retry.with_retries(self.case, action)
+        self.assertEqual(action.call_count, 1)
+
+
+class TestCheckpointed(unittest.TestCase):
+
+    def setUp(self):
+        self.case = Case()
+        self.addCleanup(retry.STATS.pop, self.case.id(), None)
+
+    def test_transient_failure_replays_the_journal(self):
+        self.case.step('first')
+        self.case.failures.append(TimeoutException('late'))
+        self.case.step('second')
+        self.case.driver.get.assert_called_once_with('https://example/form')
+        self.assertEqual(self.case.calls, ['first', 'second', 'first', 'second'])
+        self.assertEqual(self.case.resumes, 1)
+
+    def test_settled_failure_does_not_reload(self):
+        self.case.step('first')
+        self.case.failures.append(AssertionError('Text Total: 10 not found'))
+        with self.assertRaises(AssertionError):
+            self.case.step('second')
+        self.case.driver.get.assert_not_called()
+        self.assertEqual(self.case.calls, ['first', 'second'])
+
+
+if __name__ == '__main__':
+    unittest.main()
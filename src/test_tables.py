@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import tables
+
+
+class Driver:
+    # serves canned table pages the way TABLE_SCRIPT returns them
+
+    def __init__(self, *pages):
+        self.pages = list(pages)
+        self.pagers = []
+
+    def execute_async_script(self, script, pager, timeout, settle):
+        self.pagers.append(pager)
+        page = self.pages.pop(0)
+        return dict(page, more=bool(pager) and bool(self.pages))
+
+
+def page(rows, columns=('Name', 'Amount')):
+    return {'columns': list(columns), 'index': [str(i) for i in range(len(rows))], 'rows': rows}
+
+
+class TestMatches(unittest.TestCase):
+
+    def test_numbers_compare_within_tolerance(self):
+        self.assertTrue(tables.matches('$1,000.004', 1000, 0.01))
+        self.assertFalse(tables.matches('1000.02', 1000, 0.01))
+        self.assertFalse(tables.matches('n/a', 1000, 0.01))
+
+    def test_other_values(self):
+        self.assertTrue(tables.matches('anything', None, 0))
+        self.assertTrue(tables.matches(' True ', True, 0))
+        self.assertFalse(tables.matches('1', True, 0))
+        self.assertTrue(tables.matches(' Abstra ', 'Abstra', 0))
+
+
+class TestVerify(unittest.TestCase):
+
+    def test_rows_across_pages(self):
+        driver = Driver(page([['a', '1.00']]), page([['b', '2.00']]))
+        problems = tables.verify(driver, ['Name', 'Amount'], [['a', 1], ['b', 2]], pager='.next')
+        self.assertEqual(problems, [])
+        self.assertEqual(driver.pagers, ['.next', '.next'])
+
+    def test_missing_extra_and_wrong_rows(self):
+        driver = Driver(page([['a', '1.5'], ['b', '2'], ['c', '3']]))
+        problems = tables.verify(driver, ['Name'], [['a', 1], ['b', 2, 'x']], tolerance=0.1)
+        self.assertEqual(problems, [
+            "Row 1 Amount: '1.5' != 1",
+            'Row 2 has 2 cells, expected 3',
+            "Unexpected row 3: ['c', '3']",
+        ])
+        driver = Driver(page([['a', '1']]))
+        self.assertEqual(tables.verify(driver, ['Name'], [['a', 1], ['b', 2]]),
+                         ["Row 2 missing, expected ['b', 2]"])
+
+    def test_tolerance_per_column(self):
+        driver = Driver(page([['a', '1.05']]))
+        self.assertEqual(tables.verify(driver, ['Name'], [['a', 1]], tolerance={'Amount': 0.1}), [])
+        driver = Driver(page([['a', '1.05']]))
+        self.assertEqual(len(tables.verify(driver, ['Name'], [['a', 1]], tolerance={})), 1)
+
+    def test_headers_only_leave_the_pager_alone(self):
+        driver = Driver(page([['a', '1']]), page([['b', '2']]))
+        self.assertEqual(tables.verify(driver, ['Name', 'Total'], pager='.next'),
+                         ['Column Total not found'])
+        self.assertEqual(driver.pagers, [None])
+
+    def test_rows_from_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('Name,Amount\na,1.5\n')
+        self.addCleanup(os.remove, f.name)
+        self.assertEqual(tables.expected_rows(f.name), [['a', 1.5]])
+
+
+if __name__ == '__main__':
+    unittest.main()
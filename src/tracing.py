@@ -0,0 +1,229 @@
+import atexit
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from selenium.webdriver.support.wait import WebDriverWait
+
+TRACE_DIR = os.getenv("ABSTRA_TRACE_DIR")
+EPOCH = time.perf_counter()
+LOCATE_COMMANDS = {'findElement', 'findElements',
+                   'findChildElement', 'findChildElements'}
+WAIT_COMMANDS = {'executeAsyncScript'}
+
+RECORDED = []
+
+
+class Span:
+
+    def __init__(self, name, args, depth):
+        self.name = name
+        self.args = args
+        self.depth = depth
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+        self.round_trips = 0
+        self.locating = 0.0
+        self.waiting = 0.0
+        self.acting = 0.0
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def as_dict(self):
+        # time not spent inside a command was spent sleeping between polls
+        idle = max(0.0, self.duration - self.locating - self.waiting - self.acting)
+        return {
+            'name': self.name,
+            'args': self.args,
+            'depth': self.depth,
+            'start': self.start - EPOCH,
+            'duration': self.duration,
+            'round_trips': self.round_trips,
+            'locating': self.locating,
+            'waiting': self.waiting + idle,
+            'acting': self.acting,
+        }
+
+
+class Tracer:
+
+    def __init__(self, test_id):
+        self.test_id = test_id
+        self.spans = []
+        self.commands = []
+        self.stack = []
+        self.phases = []
+        self.last_url = None
+
+    def attach(self, driver):
+        instrument(driver)
+        driver.abstra_tracer = self
+
+    @contextmanager
+    def span(self, name, **args):
+        span = Span(name, args, len(self.stack))
+        self.spans.append(span)
+        self.stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            self.stack.pop()
+
+    @contextmanager
+    def phase(self, name):
+        self.phases.append(name)
+        try:
+            yield
+        finally:
+            self.phases.pop()
+
+    def command(self, name, params, start, end):
+        if self.phases:
+            phase = self.phases[-1]
+        elif name in LOCATE_COMMANDS:
+            phase = 'locate'
+        elif name in WAIT_COMMANDS:
+            phase = 'wait'
+        else:
+            phase = 'act'
+        self.commands.append((name, phase, start, end))
+        if name == 'get' and params:
+            self.last_url = params.get('url')
+        spans = self.stack
+        if not spans:
+            # commands issued straight from a test (e.g. driver.get) get their own span
+            span = Span(name, command_args(name, params), 0)
+            span.start = start
+            span.end = end
+            self.spans.append(span)
+            spans = [span]
+        for span in spans:
+            span.round_trips += 1
+            setattr(span, PHASE_ATTRS[phase],
+                    getattr(span, PHASE_ATTRS[phase]) + end - start)
+
+    def as_dict(self):
+        return {'test': self.test_id, 'spans': [s.as_dict() for s in self.spans]}
+
+    def trace_events(self):
+        events = []
+        for span in self.spans:
+            events.append({
+                'name': span.name, 'cat': 'helper', 'ph': 'X',
+                'ts': (span.start - EPOCH) * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': os.getpid(), 'tid': span.tid,
+                'args': span.as_dict(),
+            })
+        tid = self.spans[0].tid if self.spans else threading.get_ident()
+        for name, phase, start, end in self.commands:
+            events.append({
+                'name': name, 'cat': f'webdriver.{phase}', 'ph': 'X',
+                'ts': (start - EPOCH) * 1e6, 'dur': (end - start) * 1e6,
+                'pid': os.getpid(), 'tid': tid,
+            })
+        return events
+
+    def finish(self):
+        if TRACE_DIR:
+            RECORDED.append(self)
+            export(self, TRACE_DIR)
+
+
+PHASE_ATTRS = {'locate': 'locating', 'wait': 'waiting', 'act': 'acting'}
+
+
+def command_args(name, params):
+    if name == 'get' and params:
+        return {'url': params.get('url')}
+    return {}
+
+
+def instrument(driver):
+    if getattr(driver, 'abstra_instrumented', False):
+        return
+    execute = driver.execute
+
+    def timed(command, params=None):
+        tracer = getattr(driver, 'abstra_tracer', None)
+        start = time.perf_counter()
+        try:
+            return execute(command, params)
+        finally:
+            if tracer is not None:
+                tracer.command(command, params, start, time.perf_counter())
+
+    driver.execute = timed
+    driver.abstra_instrumented = True
+
+
+def traced(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        label = str(args[0])[:60] if args else None
+        with self.tracer.span(method.__name__, label=label):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class TracedWait(WebDriverWait):
+
+    def __init__(self, driver, timeout, tracer, **kwargs):
+        super().__init__(driver, timeout, **kwargs)
+        self.tracer = tracer
+
+    def until(self, method, message=""):
+        with self.tracer.phase('wait'):
+            return super().until(method, message)
+
+
+def safe_name(test_id):
+    return re.sub(r'[^\w.-]+', '_', test_id)
+
+
+def export(tracer, directory):
+    os.makedirs(directory, exist_ok=True)
+    name = safe_name(tracer.test_id)
+    with open(os.path.join(directory, f'{name}.json'), 'w') as f:
+        json.dump(tracer.as_dict(), f, indent=2)
+    with open(os.path.join(directory, f'{name}.trace.json'), 'w') as f:
+        json.dump({'traceEvents': tracer.trace_events(),
+                   'displayTimeUnit': 'ms'}, f)
+
+
+def summary(tracers=None, limit=20):
+    rows = []
+    for tracer in tracers if tracers is not None else RECORDED:
+        for span in tracer.spans:
+            if span.depth == 0 and span.end is not None:
+                rows.append((tracer.test_id, span.as_dict()))
+    rows.sort(key=lambda row: row[1]['duration'], reverse=True)
+    lines = [f"{'duration':>9} {'locate':>8} {'wait':>8} {'act':>8} {'rt':>4}  step"]
+    for test_id, span in rows[:limit]:
+        label = f" {span['args'].get('label')!r}" if span['args'].get('label') else ''
+        lines.append(
+            f"{span['duration']:9.3f} {span['locating']:8.3f} {span['waiting']:8.3f} "
+            f"{span['acting']:8.3f} {span['round_trips']:4d}  "
+            f"{test_id.rsplit('.', 1)[-1]} {span['name']}{label}")
+    return '\n'.join(lines)
+
+
+def write_summary():
+    if not RECORDED:
+        return
+    table = summary()
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    with open(os.path.join(TRACE_DIR, 'summary.txt'), 'w') as f:
+        f.write(table + '\n')
+    print(f"\nSlowest steps:\n{table}")
+
+
+if TRACE_DIR:
+    atexit.register(write_summary)
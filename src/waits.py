@@ -0,0 +1,126 @@
+import os
+
+DEFAULT_TIMEOUT = float(os.getenv("ABSTRA_TIMEOUT", "15"))
+SETTLE_MS = int(os.getenv("ABSTRA_SETTLE_MS", "2000"))
+
+# Seconds each helper waits for its elements. Override one with
+# ABSTRA_TIMEOUT_<HELPER>, e.g. ABSTRA_TIMEOUT_FILL_FILE=120.
+TIMEOUTS = {
+    'default': DEFAULT_TIMEOUT,
+    'next': DEFAULT_TIMEOUT,
+    'title': DEFAULT_TIMEOUT,
+    'expect_text': DEFAULT_TIMEOUT,
+    'expect_panda_table': 30,
+    'fill_file': 60,
+    'fill_many': DEFAULT_TIMEOUT,
+}
+
+
+def timeout(helper=None):
+    value = os.getenv(f"ABSTRA_TIMEOUT_{(helper or 'default').upper()}")
+    if value:
+        return float(value)
+    return TIMEOUTS.get(helper, TIMEOUTS['default'])
+
+
+def script_timeout():
+    overrides = [float(value) for key, value in os.environ.items()
+                 if key.startswith("ABSTRA_TIMEOUT_")]
+    return max([timeout(name) for name in TIMEOUTS] + overrides) + 5
+
+
+# Tracks DOM mutations and in-flight traffic (fetch, XHR, websocket
+# messages awaiting a reply) so a wait can tell when a step has stopped
+# changing. pool.py installs it on every new document before page scripts
+# run; the waits install it themselves when that was not possible.
+ACTIVITY_JS = """
+function abstraActivity() {
+  if (window.__abstraActivity) return window.__abstraActivity;
+  const state = {pending: 0, last: performance.now()};
+  const touch = () => { state.last = performance.now(); };
+  const begin = () => { state.pending++; touch(); };
+  const end = () => { state.pending = Math.max(0, state.pending - 1); touch(); };
+
+  new MutationObserver(touch).observe(document, {
+    childList: true, subtree: true, attributes: true, characterData: true});
+
+  if (window.fetch) {
+    const fetch = window.fetch;
+    window.fetch = function () {
+      begin();
+      return fetch.apply(this, arguments).finally(end);
+    };
+  }
+  const xhrSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    begin();
+    this.addEventListener('loadend', end);
+    return xhrSend.apply(this, arguments);
+  };
+  const send = WebSocket.prototype.send;
+  WebSocket.prototype.send = function () {
+    if (!this.__abstraTracked) {
+      this.__abstraTracked = true;
+      this.addEventListener('message', end);
+      this.addEventListener('close', () => { state.pending = 0; touch(); });
+    }
+    begin();
+    return send.apply(this, arguments);
+  };
+
+  state.settled = (settle) =>
+    state.pending === 0 && performance.now() - state.last >= settle;
+  window.__abstraActivity = state;
+  return state;
+}
+
+function abstraLookup(xpath) {
+  return document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+  ).singleNodeValue;
+}
+
+// Resolves with {elem} as soon as the element appears. Without it, elem
+// is null and timedOut tells a step that was still changing when the
+// timeout expired from one that settled without the element.
+function abstraWaitFor(xpath, timeout, settle) {
+  const activity = abstraActivity();
+  const found = abstraLookup(xpath);
+  if (found) return Promise.resolve({elem: found, timedOut: false});
+  return new Promise((resolve) => {
+    const finish = (elem, timedOut) => {
+      observer.disconnect(); clearTimeout(timer); clearInterval(idle);
+      resolve({elem, timedOut: !elem && timedOut});
+    };
+    const observer = new MutationObserver(() => {
+      const elem = abstraLookup(xpath);
+      if (elem) finish(elem, false);
+    });
+    observer.observe(document, {
+      childList: true, subtree: true, attributes: true, characterData: true});
+    const timer = setTimeout(() => finish(abstraLookup(xpath), true), timeout);
+    const idle = setInterval(() => {
+      if (settle && activity.settled(settle)) finish(abstraLookup(xpath), false);
+    }, Math.max(50, settle / 4));
+  });
+}
+"""
+
+WAIT_SCRIPT = ACTIVITY_JS + """
+const [xpath, timeout, settle, done] = arguments;
+abstraWaitFor(xpath, timeout, settle).then(
+  (result) => done([result.elem, result.timedOut]), () => done([null, false]));
+"""
+
+
+class TimedOut:
+    # what check_if_exists returns when the step never settled: falsy like
+    # a miss, but the element may still render, so it is worth a retry
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'TIMED_OUT'
+
+
+TIMED_OUT = TimedOut()
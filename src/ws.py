@@ -0,0 +1,145 @@
+import base64
+import hashlib
+import json
+import os
+import socket
+import ssl
+import struct
+from urllib.parse import urlparse
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+TEXT, BINARY, CLOSE, PING, PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+
+
+def apply_mask(data, key):
+    # xor as one big integer; per-byte loops crawl on multi-megabyte frames
+    repeated = (key * (len(data) // 4 + 1))[:len(data)]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(data), 'big')
+
+
+class WebSocket:
+
+    def __init__(self, reader, writer, mask, sock=None):
+        self.reader = reader
+        self.writer = writer
+        self.mask = mask
+        self.sock = sock
+
+    def send(self, data, opcode=TEXT):
+        if isinstance(data, str):
+            data = data.encode()
+        header = bytes([0x80 | opcode])
+        mask_bit = 0x80 if self.mask else 0
+        if len(data) < 126:
+            header += bytes([mask_bit | len(data)])
+        elif len(data) < 1 << 16:
+            header += bytes([mask_bit | 126]) + struct.pack('>H', len(data))
+        else:
+            header += bytes([mask_bit | 127]) + struct.pack('>Q', len(data))
+        if self.mask:
+            key = os.urandom(4)
+            data = apply_mask(data, key)
+            header += key
+        self.writer.write(header + data)
+        self.writer.flush()
+
+    def send_json(self, message):
+        self.send(json.dumps(message))
+
+    def _read(self, size):
+        data = self.reader.read(size)
+        if len(data) < size:
+            raise ConnectionClosed()
+        return data
+
+    def recv(self):
+        message, message_opcode = b'', None
+        while True:
+            first, second = self._read(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length, = struct.unpack('>H', self._read(2))
+            elif length == 127:
+                length, = struct.unpack('>Q', self._read(8))
+            key = self._read(4) if second & 0x80 else None
+            payload = self._read(length)
+            if key:
+                payload = apply_mask(payload, key)
+            if opcode == CLOSE:
+                raise ConnectionClosed()
+            if opcode == PING:
+                self.send(payload, PONG)
+                continue
+            if opcode == PONG:
+                continue
+            if opcode:
+                message_opcode = opcode
+            message += payload
+            if first & 0x80:
+                return message.decode() if message_opcode == TEXT else message
+
+    def recv_json(self):
+        return json.loads(self.recv())
+
+    def close(self):
+        try:
+            self.send(b'', CLOSE)
+        except OSError:
+            pass
+        if self.sock is not None:
+            self.sock.close()
+
+
+def connect(url, timeout=30, headers=None):
+    parsed = urlparse(url)
+    secure = parsed.scheme in ('wss', 'https')
+    port = parsed.port or (443 if secure else 80)
+    sock = socket.create_connection((parsed.hostname, port), timeout)
+    if secure:
+        sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parsed.hostname)
+    key = base64.b64encode(os.urandom(16)).decode()
+    path = (parsed.path or '/') + (f'?{parsed.query}' if parsed.query else '')
+    request = [
+        f'GET {path} HTTP/1.1',
+        f'Host: {parsed.netloc}',
+        'Upgrade: websocket',
+        'Connection: Upgrade',
+        f'Sec-WebSocket-Key: {key}',
+        'Sec-WebSocket-Version: 13',
+    ] + [f'{name}: {value}' for name, value in (headers or {}).items()]
+    sock.sendall(('\r\n'.join(request) + '\r\n\r\n').encode())
+
+    reader = sock.makefile('rb')
+    status = reader.readline().decode()
+    response = {}
+    while True:
+        line = reader.readline().decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        response[name.strip().lower()] = value.strip()
+    if ' 101 ' not in status or response.get('sec-websocket-accept') != accept_key(key):
+        sock.close()
+        raise ConnectionError(f'WebSocket handshake with {url} failed: {status.strip()}')
+    return WebSocket(reader, sock.makefile('wb'), mask=True, sock=sock)
+
+
+def accept(handler):
+    # upgrades a BaseHTTPRequestHandler request into a server-side socket
+    handler.send_response(101, 'Switching Protocols')
+    handler.send_header('Upgrade', 'websocket')
+    handler.send_header('Connection', 'Upgrade')
+    handler.send_header('Sec-WebSocket-Accept', accept_key(handler.headers['Sec-WebSocket-Key']))
+    handler.end_headers()
+    handler.wfile.flush()
+    handler.close_connection = True
+    return WebSocket(handler.rfile, handler.wfile, mask=False)